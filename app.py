@@ -1,13 +1,73 @@
-from flask import Flask, jsonify, send_from_directory, request
+from flask import Flask, Response, jsonify, send_from_directory, request
 from flask_cors import CORS
+import atexit
 import os
-from scraper import fetch_schedules_html, parse_schedules_html
-from scraper import fetch_scorecard_html, parse_scorecard_html
+from typing import Optional
+import upstream
+from poller import Poller
+from scraper import fetch_schedules_raw, get_schedules_json, load_flag_data_uris, refresh_schedules
+from scraper import get_scorecard_raw, get_scorecard_update, scorecard_cache_stats
+from scraper import parse_pool_stats, start_parse_pool, stop_parse_pool
+from scraper import flag_queue_stats, stop_flag_queue
+from watcher import LiveScorecardWatcher
+
+
+def _poll_schedules() -> None:
+    refresh_schedules()
+
+
+def _start_schedule_poller(app: Flask) -> None:
+    # Keep the schedules cache warm so /api/schedules never waits on upstream
+    if os.environ.get("SCHEDULE_POLLER", "0") != "1":
+        return
+    poller = Poller(
+        _poll_schedules,
+        interval=float(os.environ.get("SCHEDULE_POLL_INTERVAL", "30")),
+        jitter=float(os.environ.get("SCHEDULE_POLL_JITTER", "0.1")),
+        max_backoff=float(os.environ.get("SCHEDULE_POLL_MAX_BACKOFF", "300")),
+        name="schedule-poller",
+    )
+    app.extensions["schedule_poller"] = poller.start()
+    atexit.register(poller.stop)
+
+
+def _start_scorecard_watcher(app: Flask) -> None:
+    # Pre-fetch scorecards of matches the schedule marks as live
+    if os.environ.get("SCORECARD_WATCHER", "0") != "1":
+        return
+    watcher = LiveScorecardWatcher(
+        min_interval=float(os.environ.get("WATCHER_MIN_INTERVAL", "2")),
+        max_interval=float(os.environ.get("WATCHER_MAX_INTERVAL", "60")),
+        max_matches=int(os.environ.get("WATCHER_MAX_MATCHES", "16")),
+    )
+    app.extensions["scorecard_watcher"] = watcher.start()
+    atexit.register(watcher.stop)
+
+
+def _start_parse_pool() -> None:
+    # Spawn and warm the PARSE_WORKERS parse processes before the first request
+    if start_parse_pool():
+        atexit.register(stop_parse_pool)
+
+
+def _html_response(body: bytes, encoding: Optional[str]) -> Response:
+    # Upstream bytes as-is, labelled with the charset they were sent in
+    content_type = f"text/html; charset={encoding}" if encoding else "text/html"
+    return Response(body, content_type=content_type)
 
 
 def create_app() -> Flask:
     app = Flask(__name__, static_folder="static", static_url_path="/static")
-    CORS(app)
+    # Polling clients read the scorecard version from ETag
+    CORS(app, expose_headers=["ETag"])
+    # Registered first so it runs last, after the background fetchers stop
+    atexit.register(upstream.close)
+    load_flag_data_uris()
+    # Let flag downloads in progress finish before the mapping is flushed
+    atexit.register(stop_flag_queue)
+    _start_parse_pool()
+    _start_schedule_poller(app)
+    _start_scorecard_watcher(app)
 
     @app.route("/")
     def index():
@@ -16,28 +76,39 @@ def create_app() -> Flask:
     @app.route("/api/schedules/raw")
     def api_raw():
         try:
-            html_text = fetch_schedules_html()
-            return jsonify({"ok": True, "html": html_text})
+            return _html_response(*fetch_schedules_raw())
         except Exception as error:  # noqa: BLE001
             return jsonify({"ok": False, "error": str(error)}), 500
 
     @app.route("/api/schedules")
     def api_schedules():
         try:
-            html_text = fetch_schedules_html()
-            items = parse_schedules_html(html_text)
-            return jsonify({"ok": True, "count": len(items), "items": items})
+            embed_flags = request.args.get("embed_flags", "0").lower() in ("1", "true", "yes")
+            body = get_schedules_json(embed_flags=embed_flags)
+            return Response(body, mimetype="application/json")
         except Exception as error:  # noqa: BLE001
             return jsonify({"ok": False, "error": str(error)}), 500
 
+    @app.route("/api/status")
+    def api_status():
+        poller = app.extensions.get("schedule_poller")
+        watcher = app.extensions.get("scorecard_watcher")
+        return jsonify({
+            "ok": True,
+            "schedule_poller": poller.status() if poller else None,
+            "scorecard_watcher": watcher.status() if watcher else None,
+            "parse_pool": parse_pool_stats(),
+            "flag_queue": flag_queue_stats(),
+            "scorecard_cache": scorecard_cache_stats(),
+        })
+
     @app.route("/api/scorecard/raw")
     def api_scorecard_raw():
         try:
             url = request.args.get("url")
             if not url:
                 return jsonify({"ok": False, "error": "missing url"}), 400
-            html_text = fetch_scorecard_html(url)
-            return jsonify({"ok": True, "html": html_text})
+            return _html_response(*get_scorecard_raw(url))
         except Exception as error:  # noqa: BLE001
             return jsonify({"ok": False, "error": str(error)}), 500
 
@@ -47,9 +118,17 @@ def create_app() -> Flask:
             url = request.args.get("url")
             if not url:
                 return jsonify({"ok": False, "error": "missing url"}), 400
-            html_text = fetch_scorecard_html(url)
-            data = parse_scorecard_html(html_text)
-            return jsonify(data)
+            # ?since=<version> (from ETag) asks for a patch instead of the whole card
+            since = request.args.get("since")
+            version, data, patch = get_scorecard_update(url, since)
+            if request.if_none_match.contains(version):
+                response = Response(status=304)
+            elif patch is None:
+                response = jsonify(data)
+            else:
+                response = jsonify({"ok": True, "version": version, "since": since, "patch": patch})
+            response.set_etag(version)
+            return response
         except Exception as error:  # noqa: BLE001
             return jsonify({"ok": False, "error": str(error)}), 500
 
@@ -0,0 +1,211 @@
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import statistics
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Parsing must not start flag downloads in the background while we time it
+os.environ.setdefault("FLAG_WORKERS", "0")
+
+import bs4
+import lxml.etree
+from bs4 import BeautifulSoup
+
+import scraper
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCHEDULE_FIXTURES = ["schedules.html", "tmp/schedules.html"]
+SCORECARD_FIXTURES = ["tmp/scorecard5696.html"]
+BASELINE = os.path.join(HERE, "bench_baseline.json")
+
+# Times the page parsers and their internal stages over the saved pages and
+# reports ops/sec, p50/p99 latency and peak traced allocations per stage.
+#
+#   python3 bench_parsers.py                 # run and print
+#   python3 bench_parsers.py --save          # record bench_baseline.json
+#   python3 bench_parsers.py --check         # exit 1 on regressions vs the baseline
+#
+# Stage inputs (soup, root, tables) are built once outside the timed call.
+# Compare baselines only against runs on the same machine.
+
+Case = Tuple[str, str, Callable[[], Any]]
+
+
+def _read(rel: str) -> bytes:
+    with open(os.path.join(HERE, rel), "rb") as f:
+        return f.read()
+
+
+def _schedule_cases(rel: str) -> List[Case]:
+    html = _read(rel)
+    soup = scraper._schedules_soup(scraper._prefilter(html, "utf-8"), "utf-8")
+    root = scraper._find_content_root(soup)
+    return [
+        ("parse_schedules_html", rel, lambda: scraper.parse_schedules_html(html, "utf-8")),
+        ("strip_inert", rel, lambda: scraper.strip_inert(html)),
+        ("_extract_schedule_items", rel, lambda: scraper._extract_schedule_items(html, "utf-8")),
+        ("_parse_match_updates", rel, lambda: scraper._parse_match_updates(root)),
+        ("_parse_schedule_table", rel, lambda: scraper._parse_schedule_table(root)),
+    ]
+
+
+def _scorecard_cases(rel: str) -> List[Case]:
+    html = _read(rel)
+    soup = BeautifulSoup(scraper._prefilter(html, "utf-8"), "lxml", from_encoding="utf-8")
+    batting = [t for t in soup.select("table") if scraper._has_th_with_text(t, "batting")]
+    _, tables = scraper.parse_scorecard_incremental(html, "utf-8")
+    cases: List[Case] = [
+        ("parse_scorecard_html", rel, lambda: scraper.parse_scorecard_html(html, "utf-8")),
+        ("_parse_scorecard_bs4", rel, lambda: scraper._parse_scorecard_bs4(html, "utf-8")),
+        # Repeat poll of an unchanged page: every innings table is reused
+        ("parse_scorecard_incremental", rel, lambda: scraper.parse_scorecard_incremental(html, "utf-8", tables)),
+        ("_parse_match_info", rel, lambda: scraper._parse_match_info(soup)),
+    ]
+    if batting:
+        cases.append(("_parse_batting_table", rel, lambda: [scraper._parse_batting_table(t) for t in batting]))
+    return cases
+
+
+def _percentile(sorted_ms: List[float], q: float) -> float:
+    idx = min(len(sorted_ms) - 1, max(0, int(round(q * (len(sorted_ms) - 1)))))
+    return sorted_ms[idx]
+
+
+def measure(fn: Callable[[], Any], min_time: float, min_runs: int, warmup: int = 3) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < min_runs or time.perf_counter() - started < min_time:
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+
+    # Allocations are traced in a separate run; tracing distorts the timings
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "ops_per_sec": round(1000.0 / statistics.fmean(samples), 2),
+        "p50_ms": round(_percentile(samples, 0.50), 3),
+        "p99_ms": round(_percentile(samples, 0.99), 3),
+        "peak_kib": round(peak / 1024.0, 1),
+    }
+
+
+def run(cases: Iterable[Case], min_time: float, min_runs: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for stage, fixture, fn in cases:
+        results[f"{stage}@{fixture}"] = measure(fn, min_time, min_runs)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+        "bs4": bs4.__version__,
+        "lxml": ".".join(str(v) for v in lxml.etree.LXML_VERSION),
+        "scorecard_parser": scraper._SCORECARD_PARSER,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    # p50 latency and peak allocations may each grow by tolerance (0.25 = 25%)
+    regressions = []
+    for key, now in results.items():
+        before = baseline.get(key)
+        if not before:
+            continue
+        for metric in ("p50_ms", "peak_kib"):
+            if before[metric] and now[metric] > before[metric] * (1.0 + tolerance):
+                regressions.append(
+                    f"{key}: {metric} {before[metric]} -> {now[metric]} (+{now[metric] / before[metric] - 1.0:.0%})"
+                )
+    return regressions
+
+
+def _print_table(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]) -> None:
+    width = max(len(k) for k in results) if results else 10
+    print(f"{'stage@fixture':<{width}}  {'ops/s':>9}  {'p50 ms':>9}  {'p99 ms':>9}  {'peak KiB':>9}  {'vs base':>8}")
+    for key, r in results.items():
+        delta = ""
+        before = (baseline or {}).get(key)
+        if before and before["p50_ms"]:
+            delta = f"{r['p50_ms'] / before['p50_ms'] - 1.0:+.0%}"
+        print(
+            f"{key:<{width}}  {r['ops_per_sec']:>9.1f}  {r['p50_ms']:>9.3f}  {r['p99_ms']:>9.3f}"
+            f"  {r['peak_kib']:>9.1f}  {delta:>8}"
+        )
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the schedule and scorecard parsers")
+    parser.add_argument("--schedules", nargs="*", default=SCHEDULE_FIXTURES, help="schedules page fixtures")
+    parser.add_argument("--scorecards", nargs="*", default=SCORECARD_FIXTURES, help="scorecard page fixtures")
+    parser.add_argument("--stage", action="append", default=None, help="only run these stages (repeatable)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds to time each stage for")
+    parser.add_argument("--min-runs", type=int, default=20)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a stage regressed vs the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(None if argv is None else list(argv))
+
+    cases: List[Case] = []
+    for rel in args.schedules:
+        cases.extend(_schedule_cases(rel))
+    for rel in args.scorecards:
+        cases.extend(_scorecard_cases(rel))
+    if args.stage:
+        cases = [c for c in cases if c[0] in args.stage]
+
+    baseline: Optional[Dict[str, Any]] = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = run(cases, args.min_time, args.min_runs)
+    _print_table(results, baseline["results"] if baseline else None)
+
+    if args.save:
+        # Merge so a --stage run only replaces the stages it measured
+        merged = dict(baseline["results"]) if baseline else {}
+        merged.update(results)
+        tmp = args.baseline + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": merged}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        os.replace(tmp, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.check:
+        if baseline is None:
+            print(f"No baseline at {args.baseline}; run with --save first", file=sys.stderr)
+            raise SystemExit(2)
+        if baseline.get("environment") != environment():
+            print("Warning: baseline was recorded in a different environment", file=sys.stderr)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import json
+import math
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import flag_objects
+
+BASE = "/workspace"
+STATIC_DIR = os.path.join(BASE, "static")
+FLAGS_DIR = os.path.join(STATIC_DIR, "flags")
+FLAGS_RAW_DIR = os.path.join(FLAGS_DIR, "raw")
+SPRITE_PNG = os.path.join(FLAGS_DIR, "sprite.png")
+SPRITE_CSS = os.path.join(FLAGS_DIR, "sprite.css")
+SPRITE_INDEX = os.path.join(FLAGS_DIR, "sprite.json")
+SPRITE_URL = "/static/flags/sprite.png"
+
+# Packs every downloaded flag into one PNG so a page needs a single image
+# request, and writes sprite.json (flag id -> x/y/w/h) for the API plus
+# sprite.css with a .flag-<id> class per flag. Run after download_flags.py.
+# Needs Pillow, which the web app itself does not.
+
+
+def _load_pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise SystemExit("build_flag_sprite.py needs Pillow: pip install Pillow")
+    return Image
+
+
+def _flag_ids(raw_dir: str) -> List[str]:
+    ids = []
+    for name in os.listdir(raw_dir):
+        stem, ext = os.path.splitext(name)
+        if ext == ".gif" and stem.isdigit():
+            ids.append(stem)
+    return sorted(ids, key=int)
+
+
+def pack(sizes: Iterable[Tuple[int, int]], columns: Optional[int] = None) -> Tuple[List[Tuple[int, int]], int, int]:
+    # Grid layout with cells of the largest flag size; returns offsets and sheet size
+    sizes = list(sizes)
+    if not sizes:
+        return [], 0, 0
+    cell_w = max(w for w, _ in sizes)
+    cell_h = max(h for _, h in sizes)
+    columns = columns or max(1, math.ceil(math.sqrt(len(sizes))))
+    rows = math.ceil(len(sizes) / columns)
+    offsets = [((i % columns) * cell_w, (i // columns) * cell_h) for i in range(len(sizes))]
+    return offsets, columns * cell_w, rows * cell_h
+
+
+def build(raw_dir: str = FLAGS_RAW_DIR, columns: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+    Image = _load_pillow()
+
+    # Identical images (same content key) get one slot in the sheet
+    ids = _flag_ids(raw_dir)
+    slots: Dict[str, int] = {}
+    images = []
+    id_to_slot: Dict[str, int] = {}
+    for sid in ids:
+        path = os.path.join(raw_dir, f"{sid}.gif")
+        try:
+            key = flag_objects.content_key(path)
+            if key not in slots:
+                with Image.open(path) as im:
+                    images.append(im.convert("RGBA"))
+                slots[key] = len(images) - 1
+        except (OSError, ValueError):
+            continue
+        id_to_slot[sid] = slots[key]
+
+    offsets, width, height = pack((im.size for im in images), columns)
+    sheet = Image.new("RGBA", (max(width, 1), max(height, 1)), (0, 0, 0, 0))
+    for im, (x, y) in zip(images, offsets):
+        sheet.paste(im, (x, y))
+
+    index: Dict[str, Dict[str, int]] = {}
+    for sid, slot in id_to_slot.items():
+        x, y = offsets[slot]
+        w, h = images[slot].size
+        index[sid] = {"x": x, "y": y, "w": w, "h": h}
+
+    tmp = SPRITE_PNG + ".tmp"
+    sheet.save(tmp, format="PNG", optimize=True)
+    os.replace(tmp, SPRITE_PNG)
+    _write_text(SPRITE_INDEX, json.dumps(
+        {"url": SPRITE_URL, "width": width, "height": height, "flags": index},
+        ensure_ascii=False, indent=2,
+    ))
+    _write_text(SPRITE_CSS, _css(index))
+    return index
+
+
+def _css(index: Dict[str, Dict[str, int]]) -> str:
+    lines = [f".flag {{ display: inline-block; background-image: url({SPRITE_URL}); background-repeat: no-repeat; }}"]
+    for sid, box in sorted(index.items(), key=lambda kv: int(kv[0])):
+        lines.append(
+            f".flag-{sid} {{ width: {box['w']}px; height: {box['h']}px; "
+            f"background-position: -{box['x']}px -{box['y']}px; }}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def _write_text(path: str, text: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pack downloaded flags into one sprite sheet")
+    parser.add_argument("--raw-dir", default=FLAGS_RAW_DIR)
+    parser.add_argument("--columns", type=int, default=None)
+    args = parser.parse_args(None if argv is None else list(argv))
+    if not os.path.isdir(args.raw_dir):
+        print(f"No flags in {args.raw_dir}; run download_flags.py first", file=sys.stderr)
+        raise SystemExit(1)
+    index = build(args.raw_dir, args.columns)
+    print(f"Packed {len(index)} flags into {SPRITE_PNG}")
+    print(f"Wrote {SPRITE_INDEX} and {SPRITE_CSS}")
+
+
+if __name__ == "__main__":
+    main()
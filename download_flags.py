@@ -1,23 +1,47 @@
 import os
 import re
+import sys
 import json
-import shutil
-from typing import Dict, Optional
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
 
-import requests
 from bs4 import BeautifulSoup
 
+import flag_objects
+from flag_resolver import flag_id_from_src
+import upstream
+from singleflight import SingleFlight
+
 BASE = "/workspace"
 STATIC_DIR = os.path.join(BASE, "static")
 FLAGS_RAW_DIR = os.path.join(STATIC_DIR, "flags", "raw")
 FLAGS_BY_NAME_DIR = os.path.join(STATIC_DIR, "flags", "by-name")
+FLAGS_OBJECTS_DIR = os.path.join(STATIC_DIR, "flags", "objects")
 MAPPING_PATH = os.path.join(STATIC_DIR, "flags", "mapping.json")
 
 FLAGS_BASE_URL = "https://hamariweb.com//cricket/flags/"
 SCHEDULES_URL = "https://hamariweb.com/cricket/schedules.aspx"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123 Safari/537.36",
-}
+
+DOWNLOAD_WORKERS = int(os.environ.get("FLAG_DOWNLOAD_WORKERS", "16"))
+PER_HOST_LIMIT = int(os.environ.get("FLAG_DOWNLOAD_PER_HOST", "8"))
+
+_FLIGHTS = SingleFlight()
+# One semaphore per (host, limit), so each per_host value is honoured as given
+_HOST_LIMITS: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+_HOST_LIMITS_LOCK = threading.Lock()
+
+
+def _host_limit(url: str, per_host: int) -> threading.BoundedSemaphore:
+    key = (urlsplit(url).netloc, per_host)
+    with _HOST_LIMITS_LOCK:
+        sem = _HOST_LIMITS.get(key)
+        if sem is None:
+            sem = _HOST_LIMITS[key] = threading.BoundedSemaphore(per_host)
+        return sem
 
 
 def ensure_dirs() -> None:
@@ -32,13 +56,18 @@ def slugify(name: str) -> str:
     return s or "unknown"
 
 
-def download_gif(flag_id: int) -> Optional[str]:
+def download_gif(flag_id: int, per_host: int = PER_HOST_LIMIT) -> Optional[str]:
+    return _FLIGHTS.do(flag_id, lambda: _download_gif_once(flag_id, per_host))
+
+
+def _download_gif_once(flag_id: int, per_host: int = PER_HOST_LIMIT) -> Optional[str]:
     dst = os.path.join(FLAGS_RAW_DIR, f"{flag_id}.gif")
     if os.path.exists(dst) and os.path.getsize(dst) > 0:
         return dst
     url = f"{FLAGS_BASE_URL}{flag_id}.gif"
     try:
-        r = requests.get(url, headers=HEADERS, timeout=20)
+        with _host_limit(url, per_host):
+            r = upstream.get(url)
         r.raise_for_status()
         # Some ids may not exist; treat non-gif or tiny files as invalid
         if len(r.content) < 100:
@@ -50,21 +79,50 @@ def download_gif(flag_id: int) -> Optional[str]:
         return None
 
 
+def download_gifs(
+    flag_ids: Iterable[int],
+    workers: int = DOWNLOAD_WORKERS,
+    per_host: int = PER_HOST_LIMIT,
+    progress: bool = True,
+) -> Dict[int, Optional[str]]:
+    # Probe/download many ids at once over the shared keep-alive session;
+    # per_host caps how many requests hit one upstream host concurrently
+    ids = list(flag_ids)
+    results: Dict[int, Optional[str]] = {}
+    started = time.time()
+    found = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(download_gif, i, per_host): i for i in ids}
+        for done, fut in enumerate(as_completed(futures), 1):
+            path = fut.result()
+            results[futures[fut]] = path
+            if path:
+                found += 1
+            if progress and (done % 25 == 0 or done == len(ids)):
+                elapsed = time.time() - started
+                print(
+                    f"\r[{done}/{len(ids)}] {found} flags, {elapsed:.1f}s",
+                    end="\n" if done == len(ids) else "",
+                    file=sys.stderr,
+                    flush=True,
+                )
+    return results
+
+
 def build_id_to_name_map() -> Dict[str, str]:
     # Scrape schedules page to associate cricflag/<id>.png or flags/<id>.gif to visible team names
-    r = requests.get(SCHEDULES_URL, headers=HEADERS, timeout=20)
+    r = upstream.get(SCHEDULES_URL)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
+    soup = BeautifulSoup(r.content, "lxml")
 
     mapping: Dict[str, str] = {}
 
     def record(img_src: Optional[str], name: Optional[str]) -> None:
         if not img_src or not name:
             return
-        m = re.search(r"(?:cricflag|flags)/([0-9]+)\.(?:png|gif)", img_src)
-        if not m:
+        key = flag_id_from_src(img_src)
+        if not key:
             return
-        key = m.group(1)
         if key not in mapping:
             mapping[key] = name.strip()
 
@@ -94,21 +152,30 @@ def build_id_to_name_map() -> Dict[str, str]:
 
 
 def write_by_name_gifs(id_to_name: Dict[str, str]) -> Dict[str, str]:
-    # Returns id->relative local path mapping
-    used_names: Dict[str, int] = {}
+    # Returns id->relative local path mapping. By-name files are links to
+    # content-addressed objects, so ids sharing a name and an identical image
+    # share one entry, and unchanged entries are left untouched.
+    used_names: Dict[str, Dict[str, str]] = {}
     id_to_path: Dict[str, str] = {}
+    written = 0
     for sid, name in id_to_name.items():
         src = os.path.join(FLAGS_RAW_DIR, f"{sid}.gif")
         if not os.path.exists(src):
             continue
+        obj = flag_objects.ensure_object(src, FLAGS_OBJECTS_DIR)
+        flag_objects.place(obj, src)
         base = slugify(name)
-        count = used_names.get(base, 0)
-        out_name = base if count == 0 else f"{base}-{count+1}"
-        used_names[base] = count + 1
+        taken = used_names.setdefault(base, {})
+        out_name = taken.get(obj)
+        if out_name is None:
+            out_name = base if not taken else f"{base}-{len(taken)+1}"
+            taken[obj] = out_name
         dst = os.path.join(FLAGS_BY_NAME_DIR, f"{out_name}.gif")
-        shutil.copyfile(src, dst)
+        if flag_objects.place(obj, dst):
+            written += 1
         rel = f"/static/flags/by-name/{out_name}.gif"
         id_to_path[sid] = rel
+    print(f"Linked {written} by-name flags ({len(id_to_path) - written} unchanged)")
     return id_to_path
 
 
@@ -124,7 +191,20 @@ def _load_existing_mapping() -> Dict[str, Dict[str, str]]:
         return {"id_to_name": {}, "id_to_path": {}}
 
 
-def main() -> None:
+def _parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Download team flags and rebuild flags/mapping.json")
+    parser.add_argument("--first-id", type=int, default=1)
+    parser.add_argument("--last-id", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS,
+                        help="concurrent downloads (1 = one at a time)")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT,
+                        help="max concurrent requests to one upstream host")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    return parser.parse_args(None if argv is None else list(argv))
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = _parse_args(argv)
     ensure_dirs()
 
     # Step 0: load existing mapping to merge idempotently
@@ -132,11 +212,13 @@ def main() -> None:
 
     # Step 1: download raw gifs for a broader range of ids
     # Some flags have ids above 129 (e.g., Oman 182)
-    available = 0
-    for i in range(1, 301):
-        path = download_gif(i)
-        if path:
-            available += 1
+    results = download_gifs(
+        range(args.first_id, args.last_id + 1),
+        workers=args.workers,
+        per_host=args.per_host,
+        progress=not args.quiet,
+    )
+    available = sum(1 for path in results.values() if path)
     print(f"Downloaded/kept {available} gifs to {FLAGS_RAW_DIR}")
 
     # Step 2: map ids to names from schedules page
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import base64
+import os
+import threading
+from typing import Any, Dict, List, Mapping, Optional
+
+from flag_resolver import flag_id_from_src
+
+
+class FlagDataURIs:
+    # data:image/gif;base64,... for every flag in flags/raw, encoded once.
+    # Responses that inline flags only look strings up here.
+
+    def __init__(self, raw_dir: str) -> None:
+        self.raw_dir = raw_dir
+        self._uris: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, str]:
+        uris = self._uris
+        if uris is not None:
+            return uris
+        with self._lock:
+            if self._uris is None:
+                self._uris = self._build()
+            return self._uris
+
+    def add(self, flag_id: str) -> None:
+        # Pick up a flag downloaded after startup (copy-on-write, lookups stay lock-free)
+        uri = self._encode(os.path.join(self.raw_dir, f"{flag_id}.gif"))
+        if uri is None:
+            return
+        with self._lock:
+            if self._uris is not None:
+                self._uris = {**self._uris, flag_id: uri}
+
+    @staticmethod
+    def _encode(path: str) -> Optional[str]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        return "data:image/gif;base64," + base64.b64encode(data).decode("ascii")
+
+    def _build(self) -> Dict[str, str]:
+        uris: Dict[str, str] = {}
+        try:
+            names = os.listdir(self.raw_dir)
+        except FileNotFoundError:
+            return uris
+        for name in names:
+            stem, ext = os.path.splitext(name)
+            if ext != ".gif" or not stem.isdigit():
+                continue
+            uri = self._encode(os.path.join(self.raw_dir, name))
+            if uri is not None:
+                uris[stem] = uri
+        return uris
+
+    def embed_items(self, items: List[Dict[str, Any]], id_to_path: Mapping[str, str]) -> List[Dict[str, Any]]:
+        # Copies of items with team_images replaced by data URIs where known
+        uris = self.load()
+        path_to_id = {path: sid for sid, path in id_to_path.items()}
+        embedded = []
+        for it in items:
+            images = [self._uri_for(src, uris, path_to_id) for src in it.get("team_images") or []]
+            embedded.append({**it, "team_images": images})
+        return embedded
+
+    @staticmethod
+    def _uri_for(src: Optional[str], uris: Dict[str, str], path_to_id: Dict[str, str]) -> Optional[str]:
+        if not src:
+            return src
+        sid = path_to_id.get(src) or flag_id_from_src(src)
+        return uris.get(sid, src) if sid is not None else src
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import filecmp
+import hashlib
+import os
+import shutil
+import threading
+
+
+# Content-addressed flag images: every distinct GIF is stored once as
+# flags/objects/<hash>.gif and raw/<id>.gif and by-name/<slug>.gif are
+# hardlinks to it (symlinks, or a plain copy, where hardlinks are not
+# possible). Identical images downloaded under different ids share one file.
+
+_KEY_LENGTH = 20
+
+
+def content_key(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:_KEY_LENGTH]
+
+
+def same_content(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b) or filecmp.cmp(a, b, shallow=False)
+    except OSError:
+        return False
+
+
+def ensure_object(src: str, objects_dir: str) -> str:
+    os.makedirs(objects_dir, exist_ok=True)
+    obj = os.path.join(objects_dir, f"{content_key(src)}.gif")
+    if not os.path.exists(obj):
+        _link(src, obj)
+    return obj
+
+
+def place(obj: str, dst: str) -> bool:
+    # Point dst at obj; returns False when it already did (nothing written)
+    if os.path.lexists(dst) and same_content(obj, dst):
+        try:
+            if os.path.samefile(obj, dst):
+                return False
+        except OSError:
+            pass
+    _link(obj, dst)
+    return True
+
+
+def store(raw_path: str, objects_dir: str, dst: str) -> str:
+    # Store raw_path's content once, re-point raw_path at the shared object
+    # (dropping its duplicate bytes) and expose it at dst
+    obj = ensure_object(raw_path, objects_dir)
+    place(obj, raw_path)
+    place(obj, dst)
+    return obj
+
+
+def _link(src: str, dst: str) -> None:
+    # Build next to dst and rename over it so readers never see a partial file
+    tmp = f"{dst}.tmp-{os.getpid()}-{threading.get_ident()}"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        try:
+            os.symlink(os.path.relpath(src, os.path.dirname(dst)), tmp)
+        except OSError:
+            shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
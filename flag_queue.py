@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+class FlagEnrichmentQueue:
+    # Background workers that fetch flags the parser has not seen before.
+    # submit() never blocks: ids already queued are ignored and a full queue
+    # drops the request (the id is simply submitted again on a later parse).
+    # An id whose handler returned None is not retried for retry_after seconds.
+
+    def __init__(
+        self,
+        handler: Callable[[str, str], Any],
+        workers: int = 2,
+        maxsize: int = 1024,
+        retry_after: float = 600.0,
+        on_done: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        self.handler = handler
+        self.on_done = on_done
+        self.workers = workers
+        self.retry_after = retry_after
+        self._failed_at: Dict[str, float] = {}
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=maxsize)
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, flag_id: str, team_name: str) -> bool:
+        with self._lock:
+            if flag_id in self._pending:
+                return False
+            failed_at = self._failed_at.get(flag_id)
+            if failed_at is not None and time.time() - failed_at < self.retry_after:
+                return False
+            self._ensure_started_locked()
+            try:
+                self._queue.put_nowait((flag_id, team_name))
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self._pending.add(flag_id)
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "workers": len(self._threads),
+                "processed": self.processed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+
+    def _ensure_started_locked(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"flag-enrichment-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                self._queue.task_done()
+                return
+            flag_id, team_name = job
+            try:
+                ok = self.handler(flag_id, team_name) is not None
+            except Exception:  # noqa: BLE001
+                ok = False
+            with self._lock:
+                self._pending.discard(flag_id)
+                self.processed += 1
+                if ok:
+                    self._failed_at.pop(flag_id, None)
+                else:
+                    self.failed += 1
+                    self._failed_at[flag_id] = time.time()
+            if ok and self.on_done is not None:
+                try:
+                    self.on_done(flag_id)
+                except Exception:  # noqa: BLE001
+                    pass
+            self._queue.task_done()
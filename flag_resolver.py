@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import functools
+import os
+import re
+from typing import NamedTuple, Optional
+
+from cache import TTLCache
+from flag_store import FlagSnapshot, FlagStore
+
+
+FLAG_ID_PATTERN = re.compile(r"(?:cricflag|flags)/([0-9]+)\.(?:png|gif)")
+
+
+@functools.lru_cache(maxsize=4096)
+def flag_id_from_src(src: Optional[str]) -> Optional[str]:
+    if not src:
+        return None
+    m = FLAG_ID_PATTERN.search(src)
+    return m.group(1) if m else None
+
+
+def normalize_remote(src: Optional[str], origin: str = "https://hamariweb.com") -> Optional[str]:
+    if not src:
+        return None
+    # handle lazyloaded flags that use data-src
+    if src.startswith("data:"):
+        return None
+    if src.startswith("//"):
+        return f"https:{src}"
+    if src.startswith("/"):
+        return f"{origin}{src}"
+    return src
+
+
+class ResolvedFlag(NamedTuple):
+    flag_id: Optional[str]
+    # Mapped /static path, if the mapping knows this id
+    local: Optional[str]
+    # Whether that local file actually exists
+    on_disk: bool
+    # Absolute upstream URL
+    remote: Optional[str]
+
+    @property
+    def url(self) -> Optional[str]:
+        return self.local or self.remote
+
+
+class FlagResolver:
+    # Resolves an <img> src (or any href) once: flag id, local mapped path and
+    # normalised remote URL. Results are memoised per src in an LRU that is
+    # dropped whenever the flag mapping snapshot changes.
+
+    def __init__(self, store: FlagStore, local_root: str, maxsize: int = 4096) -> None:
+        self.store = store
+        self.local_root = local_root
+        self._memo = TTLCache(max_entries=maxsize, ttl=float("inf"))
+        self._snapshot: Optional[FlagSnapshot] = None
+
+    def resolve(self, src: Optional[str]) -> ResolvedFlag:
+        if not src:
+            return ResolvedFlag(None, None, False, None)
+        snap = self.store.snapshot()
+        if snap is not self._snapshot:
+            self._memo.clear()
+            self._snapshot = snap
+        memo = self._memo.get(src)
+        if memo is not None and memo[0] is snap:
+            return memo[1]
+        flag_id = flag_id_from_src(src)
+        local = snap.id_to_path.get(flag_id) if flag_id else None
+        on_disk = bool(local) and os.path.exists(os.path.join(self.local_root, local.lstrip("/")))
+        resolved = ResolvedFlag(flag_id, local, on_disk, normalize_remote(src))
+        self._memo.set(src, (snap, resolved))
+        return resolved
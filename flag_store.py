@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+
+class FlagSnapshot(NamedTuple):
+    id_to_path: Mapping[str, str]
+    id_to_name: Mapping[str, str]
+
+
+_EMPTY = FlagSnapshot(MappingProxyType({}), MappingProxyType({}))
+
+
+class FlagStore:
+    # flags/mapping.json held as an immutable snapshot. Readers grab the
+    # current snapshot without locking; writers copy it, apply their change
+    # and swap the reference under a lock, so a lookup never sees a
+    # half-applied update and never waits on a writer.
+    #
+    # Changes are written behind: the first update after a flush arms a timer
+    # and everything learned within flush_interval seconds goes out in one
+    # write. flush() forces it (e.g. at exit); with flush_interval <= 0 every
+    # update is written immediately.
+
+    def __init__(self, path: str, flush_interval: float = 5.0) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self._snapshot: Optional[FlagSnapshot] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._version = 0
+        self._written_version = 0
+        self._timer: Optional[threading.Timer] = None
+
+    def snapshot(self) -> FlagSnapshot:
+        snap = self._snapshot
+        if snap is not None:
+            return snap
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._read()
+            return self._snapshot
+
+    def path_for(self, flag_id: str) -> Optional[str]:
+        return self.snapshot().id_to_path.get(flag_id)
+
+    def name_for(self, flag_id: str) -> Optional[str]:
+        return self.snapshot().id_to_name.get(flag_id)
+
+    def update(
+        self,
+        id_to_path: Optional[Mapping[str, str]] = None,
+        id_to_name: Optional[Mapping[str, str]] = None,
+    ) -> bool:
+        self.snapshot()
+        with self._lock:
+            current = self._snapshot or _EMPTY
+            paths = _merged(current.id_to_path, id_to_path)
+            names = _merged(current.id_to_name, id_to_name)
+            if paths is None and names is None:
+                return False
+            self._snapshot = FlagSnapshot(
+                MappingProxyType(paths) if paths is not None else current.id_to_path,
+                MappingProxyType(names) if names is not None else current.id_to_name,
+            )
+            self._version += 1
+            if self.flush_interval > 0 and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if self.flush_interval <= 0:
+            self.flush()
+        return True
+
+    def flush(self) -> bool:
+        # Persist pending changes; returns False when there was nothing to write
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                snap = self._snapshot
+                version = self._version
+                if snap is None or version == self._written_version:
+                    return False
+            self._write(snap)
+            with self._lock:
+                self._written_version = version
+        return True
+
+    def _flush_from_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+        self.flush()
+
+    def _read(self) -> FlagSnapshot:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
+        except FileNotFoundError:
+            return _EMPTY
+        return FlagSnapshot(
+            MappingProxyType(dict(data.get("id_to_path", {}))),
+            MappingProxyType(dict(data.get("id_to_name", {}))),
+        )
+
+    def _write(self, snap: FlagSnapshot) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        data = {"id_to_path": dict(snap.id_to_path), "id_to_name": dict(snap.id_to_name)}
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+def _merged(current: Mapping[str, str], changes: Optional[Mapping[str, str]]) -> Optional[Dict[str, str]]:
+    # New dict with changes applied, or None when nothing would change
+    if not changes:
+        return None
+    if all(current.get(k) == v for k, v in changes.items()):
+        return None
+    merged = dict(current)
+    merged.update(changes)
+    return merged
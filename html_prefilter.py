@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import re
+from typing import AnyStr, Dict, List
+
+
+# Cuts the payload of <script>, <style> and <noscript> blocks and the body of
+# comments out of a page before it reaches the tree builder. The opening and
+# closing tags (and an empty <!----> per comment) stay in place, so the
+# elements around them, and the way text splits between them, are unchanged:
+# the parsers only ever lose text they already ignored.
+#
+# One left-to-right regex scan: whichever construct starts first wins, so a
+# "<script" inside a comment or a "<!--" inside a script is left alone. Works
+# on str and bytes.
+
+_INERT_TAGS = ("script", "style", "noscript")
+
+
+def _patterns(kind: type) -> Dict[str, "re.Pattern[AnyStr]"]:
+    def c(pattern: str) -> "re.Pattern[AnyStr]":
+        src = pattern.encode("ascii") if kind is bytes else pattern
+        return re.compile(src, re.I | re.S)
+
+    pats = {
+        # Empty comments (<!--> and <!--->) first, then <!-- ... --> / --!>,
+        # then an opening tag; attribute values may contain '>'
+        "start": c(
+            r"<!---?>|<!--.*?--!?>|<(" + "|".join(_INERT_TAGS) + r")(?=[\s/>])"
+            r"(?:[^>\"']|\"[^\"]*\"|'[^']*')*>"
+        ),
+    }
+    for tag in _INERT_TAGS:
+        pats[tag] = c(r"</" + tag + r"(?=[\s/>])")
+    return pats
+
+
+_STR = _patterns(str)
+_BYTES = _patterns(bytes)
+
+
+def strip_inert(html: AnyStr) -> AnyStr:
+    if isinstance(html, bytes):
+        pats, empty_comment, empty = _BYTES, b"<!---->", b""
+    else:
+        pats, empty_comment, empty = _STR, "<!---->", ""
+    start = pats["start"]
+    out: List[AnyStr] = []
+    pos = 0
+    n = len(html)
+    while pos < n:
+        m = start.search(html, pos)
+        if m is None:
+            break
+        tag = m.group(1)
+        if tag is None:
+            out.append(html[pos:m.start()])
+            out.append(empty_comment)
+            pos = m.end()
+            continue
+        if isinstance(tag, bytes):
+            tag = tag.decode("ascii")
+        close = pats[tag.lower()].search(html, m.end())
+        if close is None:
+            # Unterminated: the parser treats the rest as the element's content
+            break
+        out.append(html[pos:m.end()])
+        pos = close.start()
+        out.append(html[pos:close.end()])
+        pos = close.end()
+    if not out:
+        return html
+    out.append(html[pos:])
+    return empty.join(out)
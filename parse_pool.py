@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+from typing import Any, Callable, Dict, Optional
+
+
+class ParseExecutor:
+    # Runs CPU-bound parse functions in worker processes so parsing is not
+    # serialised on one core by the GIL. fn and its arguments must be
+    # picklable (module-level functions, bytes/str, plain dicts and lists).
+    # With workers=0, or whenever the pool cannot be used (failed to start,
+    # a worker died, timeout), the call runs inline in the calling thread.
+
+    def __init__(
+        self,
+        workers: int = 0,
+        timeout: float = 30.0,
+        warmup: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self.warmup = warmup
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.inline = 0
+        self.fallbacks = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> bool:
+        # Start the workers now and let each import and warm up before the
+        # first real parse; returns False when parsing will run inline
+        executor = self._get_executor()
+        if executor is None:
+            return False
+        if self.warmup is not None:
+            futures = [executor.submit(self.warmup) for _ in range(self.workers)]
+            for future in futures:
+                try:
+                    future.result(timeout=self.timeout)
+                except Exception as error:  # noqa: BLE001
+                    self._failed(executor, error)
+                    return False
+        return True
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        executor = self._get_executor()
+        if executor is None:
+            self.inline += 1
+            return fn(*args)
+        try:
+            # RuntimeError here means the pool was shut down under us
+            future = executor.submit(fn, *args)
+        except (OSError, RuntimeError) as error:
+            return self._fallback(executor, error, fn, *args)
+        self.submitted += 1
+        try:
+            return future.result(timeout=self.timeout)
+        except (BrokenProcessPool, FutureTimeout, PicklingError) as error:
+            # Pool trouble, not a parse error; anything fn raised propagates
+            return self._fallback(executor, error, fn, *args)
+
+    def stop(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "submitted": self.submitted,
+            "inline": self.inline,
+            "fallbacks": self.fallbacks,
+            "last_error": self.last_error,
+        }
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        executor = self._executor
+        if executor is not None:
+            return executor
+        with self._lock:
+            if self._executor is None:
+                # Never fork a process that is running request and poller threads
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                except (OSError, ValueError) as error:
+                    self.last_error = str(error)
+                    self.workers = 0
+                    return None
+            return self._executor
+
+    def _fallback(self, executor: ProcessPoolExecutor, error: BaseException, fn: Callable[..., Any], *args: Any) -> Any:
+        # Do this one here
+        self._failed(executor, error)
+        self.fallbacks += 1
+        return fn(*args)
+
+    def _failed(self, executor: ProcessPoolExecutor, error: BaseException) -> None:
+        # Drop the pool; the next call starts a fresh one
+        self.last_error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
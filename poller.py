@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class Poller:
+    # Runs fn on a daemon thread every `interval` seconds (+/- jitter) until
+    # stopped. fn may return a number to override the delay before the next
+    # run. Failures back off exponentially up to max_backoff.
+
+    def __init__(
+        self,
+        fn: Callable[[], Optional[float]],
+        interval: float,
+        jitter: float = 0.1,
+        max_backoff: float = 300.0,
+        name: str = "poller",
+    ) -> None:
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._status: Dict[str, Any] = {
+            "running": False,
+            "runs": 0,
+            "failures": 0,
+            "consecutive_failures": 0,
+            "last_started_at": None,
+            "last_success_at": None,
+            "last_duration": None,
+            "last_error": None,
+            "next_run_at": None,
+        }
+
+    def start(self) -> "Poller":
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._status["running"] = True
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        with self._lock:
+            self._status["running"] = False
+            self._status["next_run_at"] = None
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._status)
+
+    def _delay(self, base: float) -> float:
+        if self.jitter <= 0:
+            return base
+        return max(0.0, base * (1.0 + random.uniform(-self.jitter, self.jitter)))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.time()
+            with self._lock:
+                self._status["last_started_at"] = started
+            try:
+                next_interval = self.fn()
+            except Exception as error:  # noqa: BLE001
+                with self._lock:
+                    self._status["runs"] += 1
+                    self._status["failures"] += 1
+                    self._status["consecutive_failures"] += 1
+                    self._status["last_error"] = str(error)
+                    self._status["last_duration"] = time.time() - started
+                    failures = self._status["consecutive_failures"]
+                delay = min(self.interval * (2 ** failures), self.max_backoff)
+            else:
+                finished = time.time()
+                with self._lock:
+                    self._status["runs"] += 1
+                    self._status["consecutive_failures"] = 0
+                    self._status["last_error"] = None
+                    self._status["last_success_at"] = finished
+                    self._status["last_duration"] = finished - started
+                delay = self.interval if next_interval is None else next_interval
+            delay = self._delay(delay)
+            with self._lock:
+                self._status["next_run_at"] = time.time() + delay
+            self._stop.wait(delay)
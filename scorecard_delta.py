@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from cache import TTLCache
+
+
+# Versioned scorecards for polling clients. A version is a hash of the
+# scorecard's canonical JSON, so every process computes the same one for the
+# same data. Recent versions are kept per match URL; a client that sends the
+# version it holds gets a JSON Patch (RFC 6902 add/remove/replace ops) from
+# it to the current one, or the full document if that version is unknown.
+
+
+def version_of(data: Dict[str, Any]) -> str:
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+    return hashlib.blake2b(canonical.encode("ascii"), digest_size=12).hexdigest()
+
+
+def _pointer(path: str, token: Any) -> str:
+    # RFC 6901 escaping for object keys
+    return f"{path}/{str(token).replace('~', '~0').replace('/', '~1')}"
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":")))
+
+
+def diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    # Ops turning old into new, descending into objects and arrays so a
+    # changed batting row is one "replace" of its runs, not of the whole innings
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: List[Dict[str, Any]] = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer(path, key)})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+            elif old[key] != value:
+                ops.extend(diff(old[key], value, _pointer(path, key)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            if old[i] != new[i]:
+                ops.extend(diff(old[i], new[i], _pointer(path, i)))
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": _pointer(path, i), "value": new[i]})
+        # Highest index first so earlier removals do not shift later paths
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": _pointer(path, i)})
+        return ops
+    if old == new and type(old) is type(new):
+        return []
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+_MISS = object()
+
+
+class ScorecardVersions:
+    # Recent scorecard versions per URL, LRU-bounded over all matches
+
+    def __init__(self, max_versions: int = 1024, ttl: float = 3600.0) -> None:
+        # (url, version) -> (data, size of its compact JSON)
+        self._history = TTLCache(max_entries=max_versions, ttl=ttl)
+        # url -> (data, version) of the last recorded scorecard
+        self._latest = TTLCache(max_entries=max_versions, ttl=ttl)
+        # (url, since, version) -> ops, or None when the full document is smaller;
+        # every client polling from the same version gets the same patch
+        self._patches = TTLCache(max_entries=max_versions, ttl=ttl)
+
+    def record(self, url: str, data: Dict[str, Any]) -> str:
+        # Cheap for the same dict object (a cached scorecard): hashed once
+        latest = self._latest.get(url)
+        if latest is not None and latest[0] is data:
+            return latest[1]
+        version = version_of(data)
+        self._history.set((url, version), (data, _size(data)))
+        self._latest.set(url, (data, version))
+        return version
+
+    def get(self, url: str, version: str) -> Optional[Dict[str, Any]]:
+        found = self._history.get((url, version))
+        return found[0] if found is not None else None
+
+    def patch(self, url: str, data: Dict[str, Any], since: Optional[str]) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
+        # (current version, ops from since) or ops None when the client needs
+        # the full document: unknown version or a patch no smaller than it
+        version = self.record(url, data)
+        if not since:
+            return version, None
+        if since == version:
+            return version, []
+        key = (url, since, version)
+        ops = self._patches.get(key, _MISS)
+        if ops is not _MISS:
+            return version, ops
+        old = self.get(url, since)
+        current = self._history.get((url, version))
+        if old is None or current is None:
+            return version, None
+        ops = diff(old, data)
+        if _size(ops) >= current[1]:
+            ops = None
+        self._patches.set(key, ops)
+        return version, ops
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from lxml import etree
+
+
+# Scorecard parser built directly on lxml with precompiled XPath. It mirrors
+# scraper._parse_scorecard_bs4 step for step and must return exactly the same
+# data; scraper.parse_scorecard_html falls back to the bs4 parser if this one
+# raises.
+
+# bs4's get_text(" ", strip=True): every text node below the element, except
+# comments and script/style/template/rt/rp contents, stripped and joined by
+# single spaces
+_TEXTS = etree.XPath(
+    "descendant::text()[not(ancestor::script or ancestor::style or ancestor::template"
+    " or ancestor::rt or ancestor::rp)]"
+)
+_SELF_TEXTS = etree.XPath("descendant::text()")
+_RAW_TEXT_TAGS = frozenset(["script", "style", "template", "rt", "rp"])
+
+_TITLE = etree.XPath("(//title)[1]")
+_TABLES = etree.XPath("//table")
+_FIRST_TABLE = etree.XPath("(//table)[1]")
+_FIRST_THEAD = etree.XPath("(descendant::thead)[1]")
+_FIRST_TBODY = etree.XPath("(descendant::tbody)[1]")
+_FIRST_TABLE_BELOW = etree.XPath("(descendant::table)[1]")
+_ROWS = etree.XPath("descendant::tr")
+_CELLS = etree.XPath("descendant::td")
+_FIRST_B = etree.XPath("(descendant::b)[1]")
+_FIRST_SMALL = etree.XPath("(descendant::small)[1]")
+_FIRST_TH = etree.XPath("(descendant::th)[1]")
+_FIRST_TD = etree.XPath("(descendant::td)[1]")
+
+_HAS_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+_SECTION_TITLES = etree.XPath(
+    "//*[{section}]//*[{title} or self::h1 or self::h2]".format(
+        section=_HAS_CLASS.format("section_title"), title=_HAS_CLASS.format("title"),
+    )
+)
+# find_next() walks everything after the opening tag, children included
+_NEXT_TABLE_WRAP = etree.XPath(
+    "(descendant::div[contains(@class, 'table-responsive')]"
+    " | following::div[contains(@class, 'table-responsive')])[1]"
+)
+
+
+def _first(xpath: etree.XPath, el: Any) -> Optional[Any]:
+    found = xpath(el)
+    return found[0] if found else None
+
+
+def _text(el: Optional[Any]) -> str:
+    if el is None:
+        return ""
+    texts = _SELF_TEXTS(el) if el.tag in _RAW_TEXT_TAGS else _TEXTS(el)
+    return " ".join(s for s in (t.strip() for t in texts) if s)
+
+
+def _parse_batting_table(table: Any) -> Dict[str, Any]:
+    batting: List[Dict[str, Any]] = []
+    extras: Optional[str] = None
+    total: Optional[str] = None
+    info_note: Optional[str] = None
+
+    tbody = _first(_FIRST_TBODY, table)
+    if tbody is None:
+        tbody = table
+    for tr in _ROWS(tbody):
+        tds = _CELLS(tr)
+        if not tds:
+            continue
+        label = _text(tds[0]).lower()
+        if label.startswith("extras"):
+            extras = " ".join(_text(td) for td in tds[1:]).strip() or None
+            continue
+        if label.startswith("total"):
+            total = " ".join(_text(td) for td in tds[1:]).strip() or None
+            continue
+        name = _text(_first(_FIRST_B, tds[0])) or _text(tds[0])
+        dismissal = _text(_first(_FIRST_SMALL, tds[0])) or None
+        stats = [_text(tds[i]) if len(tds) > i else None for i in range(1, 6)]
+        if name and any(s for s in stats) and not label.startswith("did not bat"):
+            batting.append({
+                "name": name,
+                "dismissal": dismissal,
+                "runs": stats[0],
+                "balls": stats[1],
+                "fours": stats[2],
+                "sixes": stats[3],
+                "sr": stats[4],
+            })
+    return {"batting": batting, "extras": extras, "total": total, "note": info_note}
+
+
+def _parse_bowling_table(table: Any) -> List[Dict[str, Any]]:
+    bowlers: List[Dict[str, Any]] = []
+    tbody = _first(_FIRST_TBODY, table)
+    if tbody is None:
+        tbody = table
+    for tr in _ROWS(tbody):
+        tds = _CELLS(tr)
+        if not tds or len(tds) < 6:
+            continue
+        name, overs, maidens, runs, wickets, econ = (_text(td) for td in tds[:6])
+        if name:
+            bowlers.append({
+                "name": name, "ov": overs, "m": maidens, "r": runs, "w": wickets, "econ": econ
+            })
+    return bowlers
+
+
+def _parse_match_info(root: Any) -> Dict[str, str]:
+    info: Dict[str, str] = {}
+    title_div = None
+    for div in _SECTION_TITLES(root):
+        if "match information" in _text(div).lower():
+            title_div = div
+            break
+    table = None
+    if title_div is not None:
+        wrap = _first(_NEXT_TABLE_WRAP, title_div.getparent())
+        table = _first(_FIRST_TABLE_BELOW, wrap) if wrap is not None else None
+    if table is None:
+        table = _first(_FIRST_TABLE, root)
+    if table is None:
+        return info
+    for tr in _ROWS(table):
+        key = _text(_first(_FIRST_TH, tr))
+        val = _text(_first(_FIRST_TD, tr))
+        if key and val:
+            info[key] = val
+    return info
+
+
+def _extract_title_and_teams(root: Any) -> Tuple[Optional[str], List[str]]:
+    title = _text(_first(_TITLE, root)) or None
+    teams: List[str] = []
+    if title and " VS " in title:
+        left = title.split(" VS ", 1)[0].strip()
+        right_part = title.split(" VS ", 1)[1]
+        right = right_part.split(",", 1)[0].strip()
+        if left and right:
+            teams = [left, right]
+    return title, teams
+
+
+def parse_document(html: Union[bytes, str], encoding: Optional[str] = None) -> Any:
+    # Same libxml2 push parser bs4's lxml builder drives, so both see one tree
+    if isinstance(html, bytes) and not encoding:
+        # bs4 would guess the charset; only take pages that are valid UTF-8
+        html = html.decode("utf-8")
+    parser = etree.HTMLParser(
+        recover=True, strip_cdata=False, encoding=encoding if isinstance(html, bytes) else None,
+    )
+    parser.feed(html)
+    root = parser.close()
+    if root is None:
+        raise ValueError("empty document")
+    return root
+
+
+def _fingerprint(table: Any) -> str:
+    # The table's own markup; its parse depends on nothing outside it
+    return hashlib.blake2b(etree.tostring(table, with_tail=False), digest_size=16).hexdigest()
+
+
+def parse_scorecard_html(html: Union[bytes, str], encoding: Optional[str] = None) -> Dict[str, Any]:
+    return parse_scorecard_incremental(html, encoding)[0]
+
+
+def parse_scorecard_incremental(
+    html: Union[bytes, str],
+    encoding: Optional[str] = None,
+    tables: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    # Same result as parse_scorecard_html(). tables is what the previous call
+    # for this page returned: batting/bowling results by table fingerprint.
+    # Tables whose markup is unchanged (finished innings) are not parsed
+    # again; the returned map covers the tables of this page only.
+    previous = tables or {}
+    seen_batting: Dict[str, Any] = previous.get("batting", {})
+    seen_bowling: Dict[str, Any] = previous.get("bowling", {})
+    memo: Dict[str, Dict[str, Any]] = {"batting": {}, "bowling": {}}
+
+    root = parse_document(html, encoding)
+    title, teams = _extract_title_and_teams(root)
+
+    batting_tables: List[Any] = []
+    bowling_tables: List[Any] = []
+    for t in _TABLES(root):
+        thead = _first(_FIRST_THEAD, t)
+        if thead is None:
+            continue
+        head = _text(thead).lower()
+        if "batting" in head:
+            batting_tables.append(t)
+        elif "bowling" in head:
+            bowling_tables.append(t)
+
+    innings: List[Dict[str, Any]] = []
+    for idx, bt in enumerate(batting_tables):
+        key = _fingerprint(bt)
+        parsed = seen_batting.get(key)
+        if parsed is None:
+            parsed = _parse_batting_table(bt)
+        memo["batting"][key] = parsed
+        # Copy: team and bowling are added per response, the memo stays as parsed
+        inn: Dict[str, Any] = dict(parsed)
+        bowl = bowling_tables[idx] if idx < len(bowling_tables) else None
+        if bowl is not None:
+            key = _fingerprint(bowl)
+            bowlers = seen_bowling.get(key)
+            if bowlers is None:
+                bowlers = _parse_bowling_table(bowl)
+            memo["bowling"][key] = bowlers
+            inn["bowling"] = bowlers
+        if teams:
+            inn["team"] = teams[idx % len(teams)]
+        innings.append(inn)
+
+    info = _parse_match_info(root)
+
+    data = {
+        "ok": True,
+        "title": title,
+        "teams": teams,
+        "info": info,
+        "innings": innings,
+        "source": {
+            "batting_count": len(batting_tables),
+            "bowling_count": len(bowling_tables),
+        }
+    }
+    return data, memo
@@ -1,35 +1,94 @@
 from __future__ import annotations
 
+import atexit
+import codecs
 import re
 import time
 import json
+import hashlib
+import threading
 import os
-import shutil
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.dammit import EncodingDetector
 
+import flag_objects
+import upstream
+from cache import TTLCache
+from flag_embed import FlagDataURIs
+from flag_queue import FlagEnrichmentQueue
+from flag_resolver import FlagResolver, ResolvedFlag, normalize_remote
+from flag_store import FlagStore
+from html_prefilter import strip_inert
+from parse_pool import ParseExecutor
+from scorecard_delta import ScorecardVersions
+from singleflight import SingleFlight
+from ttl_policy import DEFAULT_POLICY as _TTL_POLICY
+
+try:
+    import scorecard_lxml
+except ImportError:  # lxml missing: bs4 parser only
+    scorecard_lxml = None
+
+
+# Page bytes as fetched, or already-decoded text
+_Markup = Union[bytes, str]
 
 _SCHEDULES_URL = "https://hamariweb.com/cricket/schedules.aspx"
-_USER_AGENT = (
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-    "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-)
 
 _STATIC_FLAGS_MAPPING = "/workspace/static/flags/mapping.json"
 _FLAGS_RAW_DIR = "/workspace/static/flags/raw"
 _FLAGS_BY_NAME_DIR = "/workspace/static/flags/by-name"
+_FLAGS_OBJECTS_DIR = "/workspace/static/flags/objects"
+_FLAGS_SPRITE_INDEX = "/workspace/static/flags/sprite.json"
+_SPRITE_CHECK_SECONDS = 30.0
 _FLAGS_BASE_URL = "https://hamariweb.com//cricket/flags/"
 
-# Simple in-memory cache with TTL to reduce upstream load
+# Page fetches ask intermediaries for a fresh copy; the rest of the headers
+# come from the shared upstream session
+_NO_CACHE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+}
+
+# Simple in-memory cache with TTL to reduce upstream load. Entries keep the
+# upstream validators (ETag / Last-Modified) so an expired body can be
+# revalidated with a conditional GET instead of downloaded again. "ttl" is
+# filled in from the parsed page (see ttl_policy); until then the default
+# applies.
 _CACHE: Dict[str, Dict[str, Any]] = {
-    "html": {"value": None, "fetched_at": 0.0},
+    "html": {"value": None, "fetched_at": 0.0, "etag": None, "last_modified": None},
 }
 _CACHE_TTL_SECONDS = 60.0
 
-# Cache for flags mapping
-_FLAGS_MAP: Dict[str, Any] = {}
+# Parsed schedules page and its serialized /api/schedules body, keyed by a
+# digest of the HTML so an unchanged page is never parsed or encoded twice
+_PARSED_CACHE: Dict[str, Dict[str, Any]] = {
+    "schedules": {"html": None, "digest": None, "sprite": None, "flags": None, "items": None, "body": None},
+}
+# Bumped whenever a flag becomes local. Part of the parsed page's key like the
+# sprite mtime, so a parse that started before the bump is never reused after it
+_FLAGS_GENERATION = {"value": 0}
+_FLAGS_GENERATION_LOCK = threading.Lock()
+
+# At most one upstream fetch (or parse) in flight per key; concurrent misses
+# wait for it instead of stampeding hamariweb
+_FLIGHTS = SingleFlight()
+
+_SCORECARD_CACHE_MAX_ENTRIES = int(os.environ.get("SCORECARD_CACHE_MAX_ENTRIES", "128"))
+_SCORECARD_CACHE_MAX_BYTES = int(os.environ.get("SCORECARD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# flags/mapping.json; lookups read an immutable snapshot, updates swap it
+# and are written to disk in batches off the request path
+_FLAG_STORE = FlagStore(
+    _STATIC_FLAGS_MAPPING,
+    flush_interval=float(os.environ.get("FLAGS_MAPPING_FLUSH_INTERVAL", "5")),
+)
+atexit.register(_FLAG_STORE.flush)
+# Serialises picking and copying by-name files so two requests learning the
+# same flag do not race for the same file name
+_FLAGS_FS_LOCK = threading.Lock()
 
 
 def _ensure_dirs() -> None:
@@ -45,33 +104,18 @@ def _slugify(name: str) -> str:
     return s or "unknown"
 
 
-def _save_flags_mapping(data: Dict[str, Any]) -> None:
-    tmp = _STATIC_FLAGS_MAPPING + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, _STATIC_FLAGS_MAPPING)
-
-
-def _load_flags_mapping() -> Dict[str, Any]:
-    global _FLAGS_MAP
-    if _FLAGS_MAP:
-        return _FLAGS_MAP
-    try:
-        with open(_STATIC_FLAGS_MAPPING, "r", encoding="utf-8") as f:
-            _FLAGS_MAP = json.load(f)
-    except FileNotFoundError:
-        _FLAGS_MAP = {"id_to_path": {}, "id_to_name": {}}
-    return _FLAGS_MAP
+def _download_flag_gif(flag_id: str) -> Optional[str]:
+    return _FLIGHTS.do(("flag", flag_id), lambda: _download_flag_gif_once(flag_id))
 
 
-def _download_flag_gif(flag_id: str) -> Optional[str]:
+def _download_flag_gif_once(flag_id: str) -> Optional[str]:
     _ensure_dirs()
     dst = os.path.join(_FLAGS_RAW_DIR, f"{flag_id}.gif")
     if os.path.exists(dst) and os.path.getsize(dst) > 0:
         return dst
     try:
         url = f"{_FLAGS_BASE_URL}{flag_id}.gif"
-        r = requests.get(url, headers={"User-Agent": _USER_AGENT}, timeout=20)
+        r = upstream.get(url)
         r.raise_for_status()
         if len(r.content) < 100:
             return None
@@ -84,17 +128,14 @@ def _download_flag_gif(flag_id: str) -> Optional[str]:
 
 def _ensure_flag_local(flag_id: str, team_name: str) -> Optional[str]:
     _ensure_dirs()
-    flags = _load_flags_mapping()
-    id_to_path: Dict[str, str] = flags.setdefault("id_to_path", {})
-    id_to_name: Dict[str, str] = flags.setdefault("id_to_name", {})
+    snap = _FLAG_STORE.snapshot()
 
     # If already mapped and file exists, return it
-    existing = id_to_path.get(flag_id)
+    existing = snap.id_to_path.get(flag_id)
     if existing and os.path.exists(os.path.join("/workspace", existing.lstrip("/"))):
         # Update name if newly learned
-        if team_name and id_to_name.get(flag_id) != team_name:
-            id_to_name[flag_id] = team_name
-            _save_flags_mapping(flags)
+        if team_name and snap.id_to_name.get(flag_id) != team_name:
+            _FLAG_STORE.update(id_to_name={flag_id: team_name})
         return existing
 
     # Ensure raw GIF exists
@@ -102,67 +143,208 @@ def _ensure_flag_local(flag_id: str, team_name: str) -> Optional[str]:
     if not raw_path:
         return None
 
-    # Create by-name copy
-    base = _slugify(team_name or f"flag-{flag_id}")
-    out_path = os.path.join(_FLAGS_BY_NAME_DIR, f"{base}.gif")
-    # If name occupied by another id, disambiguate
-    suffix = 2
-    while os.path.exists(out_path):
-        # If this file is already mapped to this id, reuse
-        rel = f"/static/flags/by-name/{os.path.basename(out_path)}"
-        if id_to_path.get(flag_id) == rel:
-            break
-        out_path = os.path.join(_FLAGS_BY_NAME_DIR, f"{base}-{suffix}.gif")
-        suffix += 1
-    shutil.copyfile(raw_path, out_path)
-    rel_path = f"/static/flags/by-name/{os.path.basename(out_path)}"
-
-    # Update mapping cache and persist
-    id_to_path[flag_id] = rel_path
-    if team_name:
-        id_to_name[flag_id] = team_name
-    _save_flags_mapping(flags)
-    # Refresh in-memory cache
-    _FLAGS_MAP = flags
+    with _FLAGS_FS_LOCK:
+        # Create by-name link to the content-addressed image
+        base = _slugify(team_name or f"flag-{flag_id}")
+        out_path = os.path.join(_FLAGS_BY_NAME_DIR, f"{base}.gif")
+        # If name occupied by a different image, disambiguate
+        suffix = 2
+        while os.path.exists(out_path):
+            # If this file is already mapped to this id or is the same image, reuse
+            rel = f"/static/flags/by-name/{os.path.basename(out_path)}"
+            if _FLAG_STORE.path_for(flag_id) == rel or flag_objects.same_content(raw_path, out_path):
+                break
+            out_path = os.path.join(_FLAGS_BY_NAME_DIR, f"{base}-{suffix}.gif")
+            suffix += 1
+        flag_objects.store(raw_path, _FLAGS_OBJECTS_DIR, out_path)
+        rel_path = f"/static/flags/by-name/{os.path.basename(out_path)}"
+
+        # Update mapping and persist
+        _FLAG_STORE.update(
+            id_to_path={flag_id: rel_path},
+            id_to_name={flag_id: team_name} if team_name else None,
+        )
     return rel_path
 
 
-def _local_gif_for_src(src: Optional[str]) -> Optional[str]:
-    if not src:
+# Inline flag images for ?embed_flags=1, encoded once from flags/raw
+_FLAG_DATA_URIS = FlagDataURIs(_FLAGS_RAW_DIR)
+
+
+def load_flag_data_uris() -> int:
+    return len(_FLAG_DATA_URIS.load())
+
+
+def _on_flag_downloaded(flag_id: str) -> None:
+    _FLAG_DATA_URIS.add(flag_id)
+    # A flag became local: the next /api/schedules reparses to pick it up
+    with _FLAGS_GENERATION_LOCK:
+        _FLAGS_GENERATION["value"] += 1
+
+
+# Unknown flags are downloaded by background workers, never while parsing
+_FLAG_QUEUE = FlagEnrichmentQueue(
+    _ensure_flag_local,
+    workers=int(os.environ.get("FLAG_WORKERS", "2")),
+    on_done=_on_flag_downloaded,
+)
+
+
+# One regex + mapping lookup per distinct src, memoised until the mapping changes
+_FLAG_RESOLVER = FlagResolver(_FLAG_STORE, "/workspace")
+
+
+def _enrich_flag(flag: ResolvedFlag, team_name: str) -> None:
+    # Learn the team name for a flag already on disk, otherwise queue the
+    # download; this response uses the mapped path or the remote image
+    if not flag.flag_id or not team_name:
+        return
+    if flag.on_disk:
+        if _FLAG_STORE.name_for(flag.flag_id) != team_name:
+            _FLAG_STORE.update(id_to_name={flag.flag_id: team_name})
+        return
+    _FLAG_QUEUE.submit(flag.flag_id, team_name)
+
+
+# sprite.json written by build_flag_sprite.py; re-read when the file changes
+_SPRITE: Dict[str, Any] = {"index": None, "mtime": None, "checked_at": 0.0}
+
+
+def _sprite_index() -> Optional[Dict[str, Any]]:
+    now = time.time()
+    if now - _SPRITE["checked_at"] < _SPRITE_CHECK_SECONDS:
+        return _SPRITE["index"]
+    try:
+        mtime = os.path.getmtime(_FLAGS_SPRITE_INDEX)
+    except OSError:
+        _SPRITE.update(index=None, mtime=None, checked_at=now)
         return None
-    m = re.search(r"(?:cricflag|flags)/([0-9]+)\.(?:png|gif)", src)
-    if not m:
+    if mtime != _SPRITE["mtime"]:
+        try:
+            with open(_FLAGS_SPRITE_INDEX, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+        _SPRITE.update(index=index, mtime=mtime)
+    _SPRITE["checked_at"] = now
+    return _SPRITE["index"]
+
+
+def _sprite_mtime() -> Optional[float]:
+    # Part of the parsed schedules' cache key: a new sprite.json changes team_sprites
+    _sprite_index()
+    return _SPRITE["mtime"]
+
+
+def _sprite_for_flag(sprite: Optional[Dict[str, Any]], flag_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not sprite or not flag_id:
         return None
-    flags = _load_flags_mapping()
-    local = flags.get("id_to_path", {}).get(m.group(1))
-    return local
+    box = sprite.get("flags", {}).get(flag_id)
+    if not box:
+        return None
+    return {"id": flag_id, **box}
+
+
+def _stale_for(entry: Dict[str, Any]) -> float:
+    # Seconds past expiry (negative while still fresh)
+    ttl = entry.get("ttl", _CACHE_TTL_SECONDS)
+    return time.time() - (entry["fetched_at"] + ttl)
 
 
 def _is_cache_fresh() -> bool:
-    fetched_at = _CACHE["html"]["fetched_at"]
-    return (time.time() - fetched_at) < _CACHE_TTL_SECONDS and _CACHE["html"]["value"] is not None
+    entry = _CACHE["html"]
+    return _stale_for(entry) < 0 and entry["value"] is not None
+
+
+def _revalidation_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    headers = dict(_NO_CACHE_HEADERS)
+    if not entry or entry.get("value") is None:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _declared_encoding(content_type: Optional[str], body: bytes) -> Optional[str]:
+    # charset from Content-Type, else from the page's <meta>; None when neither says
+    for param in (content_type or "").split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            encoding = value.strip().strip("\"'")
+            break
+    else:
+        encoding = EncodingDetector.find_declared_encoding(body, is_html=True)
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
 
 
-def fetch_schedules_html() -> str:
-    if _is_cache_fresh():
-        return _CACHE["html"]["value"]  # type: ignore[return-value]
-
-    headers = {
-        "User-Agent": _USER_AGENT,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-        "Connection": "keep-alive",
-    }
+def _decode(entry: Dict[str, Any]) -> str:
+    return entry["value"].decode(entry.get("encoding") or "utf-8", errors="replace")
 
-    resp = requests.get(_SCHEDULES_URL, headers=headers, timeout=20)
+
+def _conditional_fetch(url: str, entry: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    resp = upstream.get(url, headers=_revalidation_headers(entry))
+    now = time.time()
+    if resp.status_code == 304 and entry and entry.get("value") is not None:
+        # Unchanged upstream: keep the same body object, only extend its lifetime
+        return {**entry, "fetched_at": now}
     resp.raise_for_status()
+    # Kept as the bytes upstream sent; parsers decode them themselves
+    body = resp.content
+    return {
+        "value": body,
+        "encoding": _declared_encoding(resp.headers.get("Content-Type"), body),
+        "fetched_at": now,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
 
-    html_text = resp.text
-    _CACHE["html"]["value"] = html_text
-    _CACHE["html"]["fetched_at"] = time.time()
-    return html_text
+
+def _refresh_schedules(force: bool = False) -> Dict[str, Any]:
+    # Another flight may have refreshed the page between our check and now
+    if not force and _is_cache_fresh():
+        return _CACHE["html"]
+    entry = _conditional_fetch(_SCHEDULES_URL, _CACHE["html"])
+    # Recomputed by _schedules_parsed(): the next fixture may be closer now
+    entry.pop("ttl", None)
+    _CACHE["html"] = entry
+    return entry
+
+
+def _schedules_entry() -> Dict[str, Any]:
+    entry = _CACHE["html"]
+    if entry["value"] is None:
+        return _FLIGHTS.do(_SCHEDULES_URL, _refresh_schedules)
+
+    stale_for = _stale_for(entry)
+    if stale_for < 0:
+        return entry
+    if stale_for <= _TTL_POLICY.stale_while_revalidate:
+        # Serve the expired page now, refresh it off the request path
+        _FLIGHTS.do_async(_SCHEDULES_URL, _refresh_schedules)
+        return entry
+    try:
+        return _FLIGHTS.do(_SCHEDULES_URL, _refresh_schedules)
+    except Exception:
+        if stale_for <= _TTL_POLICY.stale_if_error:
+            return entry
+        raise
+
+
+def fetch_schedules_raw() -> Tuple[bytes, Optional[str]]:
+    # Page bytes exactly as upstream sent them, and their encoding if declared
+    entry = _schedules_entry()
+    return entry["value"], entry.get("encoding")
+
+
+def fetch_schedules_html() -> str:
+    return _decode(_schedules_entry())
 
 
 _HEADING_PATTERNS = [
@@ -177,8 +359,11 @@ def _text_matches_any(text: str, patterns: Iterable[re.Pattern[str]]) -> bool:
     return any(p.search(text) for p in patterns)
 
 
+_CONTENT_ROOT_IDS = ["main", "content", "mainContent", "ContentPlaceHolder1"]
+
+
 def _find_content_root(soup: BeautifulSoup) -> Tag:
-    for id_candidate in ["main", "content", "mainContent", "ContentPlaceHolder1"]:
+    for id_candidate in _CONTENT_ROOT_IDS:
         el = soup.find(id=id_candidate)
         if el:
             return el
@@ -187,20 +372,13 @@ def _find_content_root(soup: BeautifulSoup) -> Tag:
 
 
 def _norm_src(src: Optional[str]) -> Optional[str]:
-    if not src:
-        return None
-    # Prefer local gif when mapping exists
-    local = _local_gif_for_src(src)
-    if local:
-        return local
-    # handle lazyloaded flags that use data-src
-    if src.startswith("data:"):
-        return None
-    if src.startswith("//"):
-        return f"https:{src}"
-    if src.startswith("/"):
-        return f"https://hamariweb.com{src}"
-    return src
+    # Prefer local gif when mapping exists, else the absolute upstream URL
+    return _FLAG_RESOLVER.resolve(src).url
+
+
+def _link_candidate(href: Optional[str]) -> Optional[str]:
+    # Raw href if _norm_src() will turn it into a link
+    return href if normalize_remote(href) else None
 
 
 def _parse_match_updates(root: Tag) -> List[Dict[str, Any]]:
@@ -220,6 +398,7 @@ def _parse_match_updates(root: Tag) -> List[Dict[str, Any]]:
         team_nodes = mu.select(".teamname")
         teams: List[str] = []
         team_images: List[Optional[str]] = []
+        flags: List[Tuple[Optional[str], str]] = []
         for tn in team_nodes:
             # Prefer textual span that is not a score
             name_span = None
@@ -233,14 +412,9 @@ def _parse_match_updates(root: Tag) -> List[Dict[str, Any]]:
                 teams.append(name_text)
             img_tag = tn.find("img")
             img_src_raw = img_tag.get("src") if img_tag else None
-            # Try to enrich mapping if we have id and name
-            enriched = None
-            if img_src_raw and name_text:
-                m = re.search(r"(?:cricflag|flags)/([0-9]+)\.(?:png|gif)", img_src_raw)
-                if m:
-                    enriched = _ensure_flag_local(m.group(1), name_text)
-            img_src = enriched or _norm_src(img_src_raw)
-            team_images.append(img_src)
+            # Raw src for now, resolved by _finish_schedule_items()
+            team_images.append(img_src_raw)
+            flags.append((img_src_raw, name_text))
         if len(teams) > 2:
             teams = teams[:2]
             team_images = team_images[:2]
@@ -248,7 +422,6 @@ def _parse_match_updates(root: Tag) -> List[Dict[str, Any]]:
         # link
         link_tag = mu.find("a", href=True)
         href: Optional[str] = link_tag["href"] if link_tag else None
-        href = _norm_src(href)
 
         # timing/result
         res = mu.find(class_="match_result")
@@ -265,6 +438,7 @@ def _parse_match_updates(root: Tag) -> List[Dict[str, Any]]:
             "status": status_text,
             "time_or_venue": time_or_venue,
             "link": href,
+            "_flags": flags,
         })
     return items
 
@@ -295,6 +469,7 @@ def _parse_schedule_table(root: Tag) -> List[Dict[str, Any]]:
         # Expecting 3 tds: Teams(cell0), Match(cell1, hidden-xs), Date & Time(cell2)
         teams_names: List[str] = []
         team_images: List[Optional[str]] = []
+        flags: List[Tuple[Optional[str], str]] = []
         link: Optional[str] = None
 
         # Extract team cells within the first td
@@ -308,20 +483,15 @@ def _parse_schedule_table(root: Tag) -> List[Dict[str, Any]]:
                 img = a.find("img")
                 # Prefer data-src when present, else src
                 raw = (img.get("data-src") or img.get("src")) if img else None
-                # Enrich mapping with id+name
-                enriched = None
-                if raw and name:
-                    m = re.search(r"(?:cricflag|flags)/([0-9]+)\.(?:png|gif)", raw)
-                    if m:
-                        enriched = _ensure_flag_local(m.group(1), name)
-                team_images.append(enriched or _norm_src(raw))
+                team_images.append(raw)
+                flags.append((raw, name))
                 if not link and a.get("href"):
-                    link = _norm_src(a.get("href"))
+                    link = _link_candidate(a.get("href"))
         # Series link inside first td
         if not link:
             series_link = tds[0].find("a", href=True)
             if series_link:
-                link = _norm_src(series_link.get("href"))
+                link = _link_candidate(series_link.get("href"))
 
         match_type = None
         if len(tds) >= 2:
@@ -358,12 +528,79 @@ def _parse_schedule_table(root: Tag) -> List[Dict[str, Any]]:
             "status": status,
             "time_or_venue": date_time,
             "link": link,
+            "_flags": flags,
         })
     return items
 
 
-def parse_schedules_html(html_text: str) -> List[Dict[str, Any]]:
-    soup = BeautifulSoup(html_text, "lxml")
+# Script/style/noscript payloads and comments are cut out before parsing
+# (html_prefilter.py); HTML_PREFILTER=0 feeds pages to the parser unchanged
+_HTML_PREFILTER = os.environ.get("HTML_PREFILTER", "1") != "0"
+
+
+def _ascii_compatible(encoding: Optional[str]) -> bool:
+    try:
+        return "<".encode(encoding or "utf-8") == b"<"
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _prefilter(html: _Markup, encoding: Optional[str] = None) -> _Markup:
+    if not _HTML_PREFILTER:
+        return html
+    if isinstance(html, bytes) and not _ascii_compatible(encoding):
+        # UTF-16 and friends: the byte scanner cannot see tags
+        return html
+    return strip_inert(html)
+
+
+# "restricted" builds only the subtrees the schedule parsers read; "full"
+# builds the whole page (nav, ads, sidebars, scripts) like before
+_SCHEDULES_PARSE_MODE = os.environ.get("SCHEDULES_PARSE_MODE", "restricted")
+
+_SCHEDULE_KEEP_TAGS = frozenset(["h1", "h2", "h3", "table", "main"])
+_SCHEDULE_KEEP_CLASSES = frozenset(["match_update", "table-responsive"])
+_SCHEDULE_KEEP_IDS = frozenset(_CONTENT_ROOT_IDS)
+
+
+class _ScheduleStrainer(SoupStrainer):
+    # Keeps .match_update cards, the schedule headings and tables, and any
+    # element _find_content_root() would pick, each with its whole subtree
+
+    def allow_tag_creation(self, nsprefix: Optional[str], name: str, attrs: Any) -> bool:
+        if name in _SCHEDULE_KEEP_TAGS:
+            return True
+        if not attrs:
+            return False
+        if attrs.get("id") in _SCHEDULE_KEEP_IDS:
+            return True
+        classes = attrs.get("class")
+        if not classes:
+            return False
+        if isinstance(classes, str):
+            classes = classes.split()
+        return any(c in _SCHEDULE_KEEP_CLASSES for c in classes)
+
+
+def _soup(html: _Markup, encoding: Optional[str] = None, **kw: Any) -> BeautifulSoup:
+    if isinstance(html, bytes) and encoding:
+        kw["from_encoding"] = encoding
+    return BeautifulSoup(html, "lxml", **kw)
+
+
+def _schedules_soup(html: _Markup, encoding: Optional[str] = None) -> BeautifulSoup:
+    if _SCHEDULES_PARSE_MODE == "restricted" and hasattr(SoupStrainer, "allow_tag_creation"):
+        soup = _soup(html, encoding, parse_only=_ScheduleStrainer())
+        if soup.select_one(".match_update, table"):
+            return soup
+    # Unknown page layout (or old bs4 without tag-creation filtering)
+    return _soup(html, encoding)
+
+
+def _extract_schedule_items(html: _Markup, encoding: Optional[str] = None) -> List[Dict[str, Any]]:
+    # Tree work only, no flag mapping or other process state, so it can run in
+    # a parse worker. Images and links are still the raw src/href.
+    soup = _schedules_soup(_prefilter(html, encoding), encoding)
     root = _find_content_root(soup)
 
     # 1) Card-style match updates
@@ -371,6 +608,23 @@ def parse_schedules_html(html_text: str) -> List[Dict[str, Any]]:
 
     # 2) Table-based schedule including TBD
     table_items = _parse_schedule_table(root)
+    return card_items + table_items
+
+
+def _finish_schedule_items(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    sprite = _sprite_index()
+    for it in items:
+        # Resolve each src once: id for enrichment and the sprite, local/remote
+        # form for the response. team_images is a prefix of _flags' srcs.
+        flags = [(_FLAG_RESOLVER.resolve(src), name) for src, name in it.pop("_flags")]
+        for flag, name in flags:
+            _enrich_flag(flag, name)
+        resolved = [flag for flag, _ in flags[:len(it["team_images"])]]
+        it["team_images"] = [flag.url for flag in resolved]
+        it["link"] = _norm_src(it["link"])
+        if sprite:
+            # Offsets into sprite.png, parallel to team_images
+            it["team_sprites"] = [_sprite_for_flag(sprite, flag.flag_id) for flag in resolved]
 
     # Merge and dedupe
     merged: List[Dict[str, Any]] = []
@@ -382,7 +636,7 @@ def parse_schedules_html(html_text: str) -> List[Dict[str, Any]]:
         time_s = it.get("time_or_venue") or ""
         return f"{title}|{teams}|{time_s}"
 
-    for it in card_items + table_items:
+    for it in items:
         k = key_for(it)
         if k in seen:
             continue
@@ -393,18 +647,200 @@ def parse_schedules_html(html_text: str) -> List[Dict[str, Any]]:
     return merged
 
 
+def parse_schedules_html(html: _Markup, encoding: Optional[str] = None) -> List[Dict[str, Any]]:
+    # html may be the page bytes (decoded with encoding, or as the page declares) or a str
+    return _finish_schedule_items(_extract_schedule_items(html, encoding))
+
+
+def _encode_schedules(items: List[Dict[str, Any]]) -> bytes:
+    # Same shape and encoding as jsonify() would produce for /api/schedules
+    payload = {"ok": True, "count": len(items), "items": items}
+    body = json.dumps(payload, ensure_ascii=True, sort_keys=True, separators=(",", ":"))
+    return (body + "\n").encode("ascii")
+
+
+def _parse_schedules_cached(
+    html: bytes, encoding: Optional[str], sprite: Optional[float], flags: int,
+) -> Dict[str, Any]:
+    parsed = _PARSED_CACHE["schedules"]
+    if parsed["html"] is html and parsed["sprite"] == sprite and parsed["flags"] == flags:
+        return parsed
+    digest = f"{encoding}:{hashlib.blake2b(html, digest_size=16).hexdigest()}"
+    if parsed["digest"] == digest and parsed["sprite"] == sprite and parsed["flags"] == flags:
+        parsed = {**parsed, "html": html}
+    else:
+        items = _finish_schedule_items(_PARSE_POOL.run(_extract_schedule_items, html, encoding))
+        parsed = {
+            "html": html, "digest": digest, "sprite": sprite, "flags": flags,
+            "items": items, "body": _encode_schedules(items),
+        }
+    _PARSED_CACHE["schedules"] = parsed
+    return parsed
+
+
+def _publish_schedules(entry: Dict[str, Any]) -> Dict[str, Any]:
+    html = entry["value"]
+    sprite = _sprite_mtime()
+    # Read before parsing: a flag landing mid-parse leaves this result stale
+    flags = _FLAGS_GENERATION["value"]
+    parsed = _PARSED_CACHE["schedules"]
+    if parsed["html"] is not html or parsed["sprite"] != sprite or parsed["flags"] != flags:
+        parsed = _FLIGHTS.do(
+            ("parse", _SCHEDULES_URL), lambda: _parse_schedules_cached(html, entry.get("encoding"), sprite, flags)
+        )
+    entry = _CACHE["html"]
+    if entry["value"] is html and "ttl" not in entry:
+        # Short lifetime while a match is live, otherwise until the next fixture starts
+        _CACHE["html"] = {**entry, "ttl": _TTL_POLICY.ttl_for_schedules(parsed["items"])}
+    return parsed
+
+
+def _schedules_parsed() -> Dict[str, Any]:
+    return _publish_schedules(_schedules_entry())
+
+
+def refresh_schedules() -> List[Dict[str, Any]]:
+    # Revalidate with upstream now, regardless of TTL, and publish the result
+    entry = _FLIGHTS.do(_SCHEDULES_URL, lambda: _refresh_schedules(force=True))
+    return _publish_schedules(entry)["items"]
+
+
+def get_schedules() -> List[Dict[str, Any]]:
+    return _schedules_parsed()["items"]
+
+
+def get_schedules_json(embed_flags: bool = False) -> bytes:
+    parsed = _schedules_parsed()
+    if not embed_flags:
+        return parsed["body"]
+    body = parsed.get("body_embedded")
+    if body is None:
+        # Built once per parsed page, then served like the plain body
+        items = _FLAG_DATA_URIS.embed_items(parsed["items"], _FLAG_STORE.snapshot().id_to_path)
+        body = _encode_schedules(items)
+        if _PARSED_CACHE["schedules"] is parsed:
+            _PARSED_CACHE["schedules"] = {**parsed, "body_embedded": body}
+    return body
+
+
+def _scorecard_entry_size(entry: Dict[str, Any]) -> int:
+    size = len(entry.get("value") or "")
+    data = entry.get("data")
+    if data is not None:
+        size += len(json.dumps(data, ensure_ascii=False))
+    return size
+
+
+# Per match URL: raw HTML, its validators and (once parsed) the scorecard dict
+_SCORECARD_CACHE = TTLCache(
+    max_entries=_SCORECARD_CACHE_MAX_ENTRIES,
+    max_bytes=_SCORECARD_CACHE_MAX_BYTES,
+    ttl=_TTL_POLICY.unknown,
+    sizeof=_scorecard_entry_size,
+)
+
+
+def _refresh_scorecard(url: str) -> Dict[str, Any]:
+    cached = _SCORECARD_CACHE.peek(url)
+    previous = cached.value if cached else None
+
+    entry = _conditional_fetch(url, previous)
+    if previous is not None and entry["value"] is previous["value"]:
+        # 304: the parsed scorecard is still valid
+        entry["data"] = previous.get("data")
+    if previous is not None and previous.get("tables") is not None:
+        # Parsed innings by table fingerprint, reused when the new body is parsed
+        entry["tables"] = previous["tables"]
+    # Until the new body is parsed, assume the match is in the state it was before
+    last_data = entry.get("data") or (previous or {}).get("data")
+    _SCORECARD_CACHE.set(url, entry, ttl=_TTL_POLICY.ttl_for_scorecard(last_data))
+    return entry
+
+
+def _refresh_and_parse_scorecard(url: str) -> Dict[str, Any]:
+    entry = _refresh_scorecard(url)
+    if entry.get("data") is None:
+        entry = {**entry, "data": _parse_scorecard_entry(url, entry)}
+    return entry
+
+
+def _scorecard_entry(url: str) -> Dict[str, Any]:
+    entry = _SCORECARD_CACHE.get(url)
+    if entry is not None:
+        return entry
+
+    cached = _SCORECARD_CACHE.peek(url)
+    if cached is None:
+        return _FLIGHTS.do(url, lambda: _SCORECARD_CACHE.get(url) or _refresh_scorecard(url))
+
+    stale_for = time.time() - cached.expires_at
+    if stale_for <= _TTL_POLICY.stale_while_revalidate:
+        # Serve the expired scorecard now, refetch and reparse it in the background
+        _FLIGHTS.do_async(url, lambda: _refresh_and_parse_scorecard(url))
+        return cached.value
+    try:
+        return _FLIGHTS.do(url, lambda: _SCORECARD_CACHE.get(url) or _refresh_scorecard(url))
+    except Exception:
+        if stale_for <= _TTL_POLICY.stale_if_error:
+            return cached.value
+        raise
+
+
+def _parse_scorecard_entry(url: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    cached = _SCORECARD_CACHE.peek(url)
+    if cached is not None and cached.value.get("data") is not None:
+        return cached.value["data"]
+    data, tables = _PARSE_POOL.run(
+        parse_scorecard_incremental, entry["value"], entry.get("encoding"), entry.get("tables")
+    )
+    if cached is not None and cached.value is entry:
+        # Live matches expire in seconds, finished ones in hours
+        expires_at = entry["fetched_at"] + _TTL_POLICY.ttl_for_scorecard(data)
+        _SCORECARD_CACHE.set(url, {**entry, "data": data, "tables": tables}, expires_at=expires_at)
+    return data
+
+
+def get_scorecard_raw(url: str) -> Tuple[bytes, Optional[str]]:
+    entry = _scorecard_entry(url)
+    return entry["value"], entry.get("encoding")
+
+
 def fetch_scorecard_html(url: str) -> str:
-    headers = {
-        "User-Agent": _USER_AGENT,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-        "Connection": "keep-alive",
-    }
-    resp = requests.get(url, headers=headers, timeout=25)
-    resp.raise_for_status()
-    return resp.text
+    return _decode(_scorecard_entry(url))
+
+
+def _scorecard_data(url: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    data = entry.get("data")
+    if data is None:
+        data = _FLIGHTS.do(("parse", url), lambda: _parse_scorecard_entry(url, entry))
+    return data
+
+
+def refresh_scorecard(url: str) -> Dict[str, Any]:
+    # Revalidate with upstream now, regardless of TTL, and cache the parse
+    entry = _FLIGHTS.do(url, lambda: _refresh_and_parse_scorecard(url))
+    return _scorecard_data(url, entry)
+
+
+def get_scorecard(url: str) -> Dict[str, Any]:
+    return _scorecard_data(url, _scorecard_entry(url))
+
+
+# Scorecards recently served per match, so pollers can be sent patches
+_SCORECARD_VERSIONS = ScorecardVersions(
+    max_versions=int(os.environ.get("SCORECARD_VERSIONS_MAX", "1024")),
+    ttl=float(os.environ.get("SCORECARD_VERSIONS_TTL", "3600")),
+)
+
+
+def get_scorecard_update(
+    url: str, since: Optional[str] = None
+) -> Tuple[str, Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+    # (version, scorecard, patch from since); patch is None when the client
+    # must be sent the whole scorecard
+    data = get_scorecard(url)
+    version, patch = _SCORECARD_VERSIONS.patch(url, data, since)
+    return version, data, patch
 
 
 def _text(el: Optional[Tag]) -> str:
@@ -519,8 +955,8 @@ def _extract_title_and_teams(soup: BeautifulSoup) -> Tuple[Optional[str], List[s
     return title, teams
 
 
-def parse_scorecard_html(html_text: str) -> Dict[str, Any]:
-    soup = BeautifulSoup(html_text, "lxml")
+def _parse_scorecard_bs4(html: _Markup, encoding: Optional[str] = None) -> Dict[str, Any]:
+    soup = _soup(html, encoding)
     title, teams = _extract_title_and_teams(soup)
 
     # Collect all tables then select those with headers
@@ -561,4 +997,74 @@ def parse_scorecard_html(html_text: str) -> Dict[str, Any]:
             "batting_count": len(batting_tables),
             "bowling_count": len(bowling_tables),
         }
-    }
\ No newline at end of file
+    }
+
+# "lxml" (default) parses scorecards with scorecard_lxml's XPath engine,
+# "bs4" with the BeautifulSoup parser above. Both return the same data; the
+# lxml engine falls back to bs4 if it is unavailable or raises.
+_SCORECARD_PARSER = os.environ.get("SCORECARD_PARSER", "lxml")
+
+
+def parse_scorecard_html(html: _Markup, encoding: Optional[str] = None) -> Dict[str, Any]:
+    html = _prefilter(html, encoding)
+    if _SCORECARD_PARSER == "lxml" and scorecard_lxml is not None:
+        try:
+            return scorecard_lxml.parse_scorecard_html(html, encoding)
+        except Exception:  # noqa: BLE001
+            pass
+    return _parse_scorecard_bs4(html, encoding)
+
+
+def parse_scorecard_incremental(
+    html: _Markup,
+    encoding: Optional[str] = None,
+    tables: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Dict[str, Any]]]]:
+    # parse_scorecard_html() that skips batting/bowling tables unchanged since
+    # the parse that returned tables (lxml engine only; None from bs4)
+    html = _prefilter(html, encoding)
+    if _SCORECARD_PARSER == "lxml" and scorecard_lxml is not None:
+        try:
+            return scorecard_lxml.parse_scorecard_incremental(html, encoding, tables)
+        except Exception:  # noqa: BLE001
+            pass
+    return _parse_scorecard_bs4(html, encoding), None
+
+
+def _warm_parse_worker() -> None:
+    # Runs once in each parse worker: imports are done, parsers exercised
+    parse_scorecard_html(b"<table><thead><tr><th>Batting</th></tr></thead></table>", "utf-8")
+    _extract_schedule_items(b"<table class='table'><tr><td>-</td></tr></table>", "utf-8")
+
+
+# Scorecard and schedules parsing in PARSE_WORKERS processes (0: inline)
+_PARSE_POOL = ParseExecutor(
+    workers=int(os.environ.get("PARSE_WORKERS", "0")),
+    timeout=float(os.environ.get("PARSE_TIMEOUT", "30")),
+    warmup=_warm_parse_worker,
+)
+
+
+def start_parse_pool() -> bool:
+    return _PARSE_POOL.start()
+
+
+def stop_parse_pool() -> None:
+    _PARSE_POOL.stop()
+
+
+def parse_pool_stats() -> Dict[str, Any]:
+    return _PARSE_POOL.stats()
+
+
+def scorecard_cache_stats() -> Dict[str, Any]:
+    return _SCORECARD_CACHE.stats()
+
+
+def stop_flag_queue() -> None:
+    _FLAG_QUEUE.stop()
+
+
+def flag_queue_stats() -> Dict[str, Any]:
+    return _FLAG_QUEUE.stats()
+
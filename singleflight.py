@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    # Collapses concurrent calls for the same key into one execution: the first
+    # caller runs fn, everyone arriving while it is in flight blocks and gets
+    # the same result (or exception). Nothing is remembered once it finishes,
+    # caching is up to the caller.
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore[no-any-return]
+
+        self._run(key, call, fn)
+        if call.error is not None:
+            raise call.error
+        return call.result  # type: ignore[no-any-return]
+
+    def do_async(self, key: Hashable, fn: Callable[[], Any]) -> bool:
+        # Start fn for key on a daemon thread unless it is already in flight.
+        # Errors are kept for any do() callers that joined, not raised here.
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = _Call()
+            self._calls[key] = call
+        thread = threading.Thread(
+            target=self._run, args=(key, call, fn), name=f"singleflight-{key!r}", daemon=True
+        )
+        thread.start()
+        return True
+
+    def _run(self, key: Hashable, call: _Call, fn: Callable[[], Any]) -> None:
+        try:
+            call.result = fn()
+        except BaseException as error:  # noqa: BLE001
+            call.error = error
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+
+LIVE = "live"
+UPCOMING = "upcoming"
+FINISHED = "finished"
+UNKNOWN = "unknown"
+
+_FINISHED_PATTERN = re.compile(
+    r"\b(?:match ended|beat|won by|won the match|drawn|draw|tied|abandoned|no result|cancelled)\b",
+    re.I,
+)
+_UPCOMING_PATTERN = re.compile(r"\b(?:upcoming|yet to (?:begin|start)|starts?|scheduled)\b", re.I)
+_LIVE_PATTERN = re.compile(r"\b(?:live|need|require|trail|lead|stumps|innings break|day \d)\b", re.I)
+
+# Fixture times on hamariweb look like "Aug 24, 2025 - 9:30 PM PST" where PST
+# is Pakistan Standard Time (UTC+5); the AM/PM marker is sometimes left out
+_START_TIME_PATTERN = re.compile(
+    r"([A-Z][a-z]{2} \d{1,2}, \d{4})\s*-?\s*(\d{1,2}:\d{2})(?:\s*([AP]M)\b)?\s*(?:PST)?", re.I
+)
+_PKT = timezone(timedelta(hours=5))
+
+
+def _env_seconds(name: str, default: float) -> float:
+    # "inf" is accepted and means "never expires"
+    return float(os.environ.get(name, str(default)))
+
+
+class TTLPolicy:
+    # Cache lifetimes (seconds) per match state. Finished matches almost never
+    # change, upcoming ones only change when they start, live ones every ball.
+
+    def __init__(
+        self,
+        live: float = 5.0,
+        upcoming: float = 2 * 3600.0,
+        finished: float = 6 * 3600.0,
+        unknown: float = 60.0,
+        schedules_live: float = 15.0,
+        schedules_max: float = 900.0,
+        stale_while_revalidate: float = 300.0,
+        stale_if_error: float = 3600.0,
+    ) -> None:
+        self.live = live
+        self.upcoming = upcoming
+        self.finished = finished
+        self.unknown = unknown
+        self.schedules_live = schedules_live
+        self.schedules_max = schedules_max
+        # How long past expiry an entry may still be served: instantly while a
+        # background refresh runs, or in place of an upstream error
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+
+    @classmethod
+    def from_env(cls) -> "TTLPolicy":
+        return cls(
+            live=_env_seconds("TTL_LIVE", 5.0),
+            upcoming=_env_seconds("TTL_UPCOMING", 2 * 3600.0),
+            finished=_env_seconds("TTL_FINISHED", 6 * 3600.0),
+            unknown=_env_seconds("TTL_UNKNOWN", 60.0),
+            schedules_live=_env_seconds("TTL_SCHEDULES_LIVE", 15.0),
+            schedules_max=_env_seconds("TTL_SCHEDULES_MAX", 900.0),
+            stale_while_revalidate=_env_seconds("STALE_WHILE_REVALIDATE", 300.0),
+            stale_if_error=_env_seconds("STALE_IF_ERROR", 3600.0),
+        )
+
+    def ttl_for(self, state: str) -> float:
+        return {
+            LIVE: self.live,
+            UPCOMING: self.upcoming,
+            FINISHED: self.finished,
+        }.get(state, self.unknown)
+
+    def ttl_for_scorecard(self, data: Optional[Dict[str, Any]], now: Optional[float] = None) -> float:
+        state = classify_scorecard(data)
+        if state != UPCOMING:
+            return self.ttl_for(state)
+        # Pre-match card: keep it only until the match is due to begin. With
+        # no start time on the card (or one already passed) it may go live
+        # any minute.
+        now = time.time() if now is None else now
+        start = scorecard_start_time(data)
+        if start is None or start <= now:
+            return self.unknown
+        return min(self.upcoming, max(start - now, self.schedules_live))
+
+    def ttl_for_schedules(self, items: Iterable[Dict[str, Any]], now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        ttl = self.schedules_max
+        for it in items:
+            state = classify_schedule_item(it)
+            if state == LIVE:
+                return min(ttl, self.schedules_live)
+            if state == UPCOMING:
+                # Refetch the page once the next fixture is due to begin
+                start = parse_start_time(it.get("time_or_venue"))
+                if start is not None and start > now:
+                    ttl = min(ttl, max(start - now, self.schedules_live))
+        return ttl
+
+
+def parse_start_time(text: Optional[str]) -> Optional[float]:
+    if not text:
+        return None
+    m = _START_TIME_PATTERN.search(text)
+    if not m:
+        return None
+    day, clock, meridiem = m.groups()
+    try:
+        if meridiem:
+            dt = datetime.strptime(f"{day} {clock} {meridiem.upper()}", "%b %d, %Y %I:%M %p")
+        else:
+            dt = datetime.strptime(f"{day} {clock}", "%b %d, %Y %H:%M")
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=_PKT).timestamp()
+
+
+def scorecard_start_time(data: Optional[Dict[str, Any]]) -> Optional[float]:
+    # A start time in any Match Information value, or in Date and Time rows
+    # read together
+    values = [str(v) for v in ((data or {}).get("info") or {}).values()]
+    for text in values + [" ".join(values)]:
+        start = parse_start_time(text)
+        if start is not None:
+            return start
+    return None
+
+
+def classify_schedule_item(item: Dict[str, Any]) -> str:
+    status = (item.get("status") or "").strip()
+    detail = item.get("time_or_venue") or ""
+    # Cards stay labelled "Live" for a while after the result is in
+    if _FINISHED_PATTERN.search(status) or _FINISHED_PATTERN.search(detail):
+        return FINISHED
+    if status.lower() == "live" or _LIVE_PATTERN.search(status):
+        return LIVE
+    if _UPCOMING_PATTERN.search(status) or parse_start_time(detail) is not None:
+        return UPCOMING
+    return UNKNOWN
+
+
+def classify_scorecard(data: Optional[Dict[str, Any]]) -> str:
+    if not data:
+        return UNKNOWN
+    info = data.get("info") or {}
+    status = info.get("Match Status") or ""
+    if _FINISHED_PATTERN.search(status):
+        return FINISHED
+    innings = data.get("innings") or []
+    if any(inn.get("batting") for inn in innings):
+        return LIVE
+    if _LIVE_PATTERN.search(status) or info.get("Toss"):
+        # Toss done but no balls bowled yet: about to go live
+        return LIVE
+    return UPCOMING
+
+
+DEFAULT_POLICY = TTLPolicy.from_env()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+)
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Connection": "keep-alive",
+}
+
+# Pool sizing: one pool per upstream host (hamariweb.com, cric.hamariweb.com, ...)
+# and up to POOL_MAXSIZE kept-alive sockets in each, so concurrent request
+# threads reuse connections instead of paying a TCP+TLS handshake every time.
+POOL_CONNECTIONS = int(os.environ.get("UPSTREAM_POOL_CONNECTIONS", "8"))
+POOL_MAXSIZE = int(os.environ.get("UPSTREAM_POOL_MAXSIZE", "32"))
+POOL_BLOCK = os.environ.get("UPSTREAM_POOL_BLOCK", "0") == "1"
+CONNECT_TIMEOUT = float(os.environ.get("UPSTREAM_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.environ.get("UPSTREAM_READ_TIMEOUT", "20"))
+
+Timeout = Union[float, Tuple[float, float]]
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        pool_block=POOL_BLOCK,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Over requests' defaults, so Accept-Encoding: gzip, deflate is still sent
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    session = _session
+    if session is not None:
+        return session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def close() -> None:
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _resolve_timeout(timeout: Optional[Timeout]) -> Timeout:
+    if timeout is None:
+        return (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if isinstance(timeout, tuple):
+        return timeout
+    return (min(CONNECT_TIMEOUT, float(timeout)), float(timeout))
+
+
+def get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[Timeout] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    # Per-call headers are merged over DEFAULT_HEADERS by the session
+    return get_session().get(url, headers=headers, timeout=_resolve_timeout(timeout), **kwargs)
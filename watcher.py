@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Set
+
+import scraper
+from poller import Poller
+from ttl_policy import DEFAULT_POLICY, FINISHED, LIVE, TTLPolicy, classify_schedule_item, classify_scorecard
+
+
+def live_scorecard_urls(items: Iterable[Dict[str, Any]]) -> List[str]:
+    urls: List[str] = []
+    for it in items:
+        link = it.get("link")
+        if link and classify_schedule_item(it) == LIVE and link not in urls:
+            urls.append(link)
+    return urls
+
+
+class LiveScorecardWatcher:
+    # Keeps scorecards of live matches pre-fetched and pre-parsed in the
+    # scraper's scorecard cache. Live matches are discovered from the parsed
+    # schedule; each one is refreshed shortly before its cache entry expires
+    # and dropped once the schedule or its own scorecard says it is over.
+
+    def __init__(
+        self,
+        policy: TTLPolicy = DEFAULT_POLICY,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        max_matches: int = 16,
+        refresh_ahead: float = 0.8,
+    ) -> None:
+        self.policy = policy
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_matches = max_matches
+        # Refresh at this fraction of the TTL so clients never see it expire
+        self.refresh_ahead = refresh_ahead
+        self._lock = threading.Lock()
+        self._watched: Dict[str, Dict[str, Any]] = {}
+        # Scorecard says finished while the schedule still lists it as live
+        self._finished: Set[str] = set()
+        self.poller = Poller(self.tick, interval=max_interval, jitter=0.0, name="scorecard-watcher")
+
+    def start(self) -> "LiveScorecardWatcher":
+        self.poller.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self.poller.stop(timeout)
+
+    def _next_delay(self, ttl: float) -> float:
+        return min(max(ttl * self.refresh_ahead, self.min_interval), self.max_interval)
+
+    def _refresh(self, url: str, state: Dict[str, Any], now: float) -> bool:
+        # Returns False when the match has finished and should stop being watched
+        try:
+            data = scraper.refresh_scorecard(url)
+        except Exception as error:  # noqa: BLE001
+            state["failures"] += 1
+            state["last_error"] = str(error)
+            state["due_at"] = now + min(self.min_interval * (2 ** state["failures"]), self.max_interval)
+            return True
+        match_state = classify_scorecard(data)
+        state.update(failures=0, last_error=None, state=match_state, refreshed_at=time.time())
+        if match_state == FINISHED:
+            return False
+        state["due_at"] = now + self._next_delay(self.policy.ttl_for(match_state))
+        return True
+
+    def tick(self) -> float:
+        listed = live_scorecard_urls(scraper.get_schedules())
+        self._finished.intersection_update(listed)
+        live = [url for url in listed if url not in self._finished][: self.max_matches]
+        now = time.time()
+        with self._lock:
+            watched = dict(self._watched)
+        for url in list(watched):
+            if url not in live:
+                del watched[url]
+        for url in live:
+            watched.setdefault(url, {"due_at": now, "failures": 0, "last_error": None, "state": None, "refreshed_at": None})
+
+        for url, state in list(watched.items()):
+            if state["due_at"] <= now and not self._refresh(url, state, now):
+                del watched[url]
+                self._finished.add(url)
+
+        with self._lock:
+            self._watched = watched
+        if not watched:
+            return self.max_interval
+        next_due = min(state["due_at"] for state in watched.values())
+        return min(max(next_due - time.time(), self.min_interval), self.max_interval)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            matches = {url: dict(state) for url, state in self._watched.items()}
+        return {**self.poller.status(), "matches": matches}